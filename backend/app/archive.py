@@ -0,0 +1,119 @@
+import argparse
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, insert, select, text
+
+from . import migrations, models
+from .config import TICKET_ARCHIVE_AFTER_DAYS, TICKET_ARCHIVE_BATCH, TICKET_ARCHIVE_INTERVAL_S, TICKET_ARCHIVE_STATUSES
+from .db import SessionLocal
+
+log = logging.getLogger(__name__)
+
+# Moves tickets closed for longer than TICKET_ARCHIVE_AFTER_DAYS from tickets to
+# tickets_archive, oldest ids first, in transactions of at most `batch` rows so
+# neither table is locked for long. Archived tickets keep their id and still
+# count in ticket_stats. GET/PATCH/DELETE by id, search and the export cover the
+# archive; the admin list does with include_archived. Reopening an archived
+# ticket moves it back to tickets.
+
+T = models.Ticket
+A = models.TicketArchive
+COLUMNS = ("id", "name", "email", "subject", "message", "status", "created_at", "closed_at")
+BATCH_PAUSE_S = 0.05  # between batches, so foreground writes get the locks
+
+
+def _cutoff(days: int) -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days)
+
+
+def move_batch(db, cutoff: datetime, batch: int = TICKET_ARCHIVE_BATCH) -> int:
+    ids = db.scalars(
+        select(T.id)
+        .where(T.status.in_(TICKET_ARCHIVE_STATUSES), T.closed_at < cutoff)
+        .order_by(T.id)
+        .limit(batch)
+        .with_for_update()
+    ).all()
+    if not ids:
+        return 0
+    db.execute(
+        insert(A).from_select(COLUMNS, select(*(getattr(T, c) for c in COLUMNS)).where(T.id.in_(ids)))
+    )
+    db.execute(delete(T).where(T.id.in_(ids)).execution_options(synchronize_session=False))
+    db.commit()
+    return len(ids)
+
+
+def run(days: int = TICKET_ARCHIVE_AFTER_DAYS, batch: int = TICKET_ARCHIVE_BATCH, max_batches: Optional[int] = None) -> int:
+    cutoff = _cutoff(days)
+    moved = batches = 0
+    with SessionLocal() as db:
+        while max_batches is None or batches < max_batches:
+            n = move_batch(db, cutoff, batch)
+            moved += n
+            batches += 1
+            if n < batch:
+                break
+            time.sleep(BATCH_PAUSE_S)
+    return moved
+
+
+def _run_locked() -> int:
+    # With several workers, only the one holding the MySQL lock archives this round.
+    with SessionLocal() as db:
+        mysql = db.get_bind().dialect.name == "mysql"
+        if mysql and not db.execute(text("SELECT GET_LOCK('it_service_archive', 0)")).scalar():
+            return 0
+        try:
+            return run()
+        finally:
+            if mysql:
+                db.execute(text("SELECT RELEASE_LOCK('it_service_archive')"))
+
+
+def _loop(stop: threading.Event) -> None:
+    while not migrations.schema_ready.wait(0.5):
+        if stop.is_set():
+            return
+    while not stop.wait(TICKET_ARCHIVE_INTERVAL_S):
+        try:
+            moved = _run_locked()
+            if moved:
+                log.info("archived %d tickets", moved)
+        except Exception:
+            log.exception("ticket archiving failed; will retry")
+
+
+_stop = threading.Event()
+_thread = None
+
+
+def start() -> None:
+    global _thread
+    if not (TICKET_ARCHIVE_INTERVAL_S and TICKET_ARCHIVE_AFTER_DAYS) or _thread is not None:
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, args=(_stop,), name="ticket-archive", daemon=True)
+    _thread.start()
+
+
+def stop() -> None:
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=5)
+        _thread = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old closed tickets into tickets_archive.")
+    parser.add_argument("--days", type=int, default=TICKET_ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch", type=int, default=TICKET_ARCHIVE_BATCH)
+    parser.add_argument("--max-batches", type=int)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(f"archived {run(args.days, args.batch, args.max_batches)} tickets")
@@ -0,0 +1,207 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import schemas, crud_async as crud, cache, serialize, spool, stats
+from .auth import verify_token
+from .config import FAST_JSON, TICKET_SPOOL
+from .db_async import AsyncSessionLocal, get_async_db, get_async_read_db
+
+# Async counterparts of the DB-backed routes in main.py, mounted in their place when DB_ASYNC is set.
+router = APIRouter()
+
+async def _load_list(fetch, schema, fast):
+    async with AsyncSessionLocal() as db:
+        if FAST_JSON:
+            return fast.dump((await db.execute(fast.select())).all())
+        return [schema.model_validate(row).model_dump(mode="json") for row in await fetch(db)]
+
+async def _load_about():
+    async with AsyncSessionLocal() as db:
+        about = await crud.get_about(db)
+        if not about:
+            raise HTTPException(status_code=404, detail="About not found")
+        return schemas.AboutOut.model_validate(about).model_dump(mode="json")
+
+PUBLIC_LOADERS = {
+    cache.SERVICES: lambda: _load_list(crud.get_services, schemas.ServiceOut, serialize.SERVICES),
+    cache.ABOUT: _load_about,
+    cache.LEADERS: lambda: _load_list(crud.get_leaders, schemas.LeaderOut, serialize.LEADERS),
+    cache.RESOURCES: lambda: _load_list(crud.get_resources, schemas.ResourceOut, serialize.RESOURCES),
+    cache.PARTNERS: lambda: _load_list(crud.get_partners, schemas.PartnerOut, serialize.PARTNERS),
+}
+
+async def _load_site():
+    sections = {}
+    for key, loader in PUBLIC_LOADERS.items():
+        try:
+            sections[key] = await cache.content_cache.aget(key, loader)
+        except HTTPException:
+            sections[key] = None
+    return cache.assemble_site(sections)
+
+# --- Site snapshot ---
+@router.get("/api/site", response_model=schemas.SiteOut)
+async def get_site(request: Request):
+    return await cache.cached_response_async(request, cache.SITE, _load_site)
+
+# --- Services ---
+@router.get("/api/services", response_model=list[schemas.ServiceOut])
+async def list_services(request: Request):
+    return await cache.cached_response_async(request, cache.SERVICES, PUBLIC_LOADERS[cache.SERVICES])
+
+@router.post("/api/services", response_model=schemas.ServiceOut, status_code=201)
+async def add_service(payload: schemas.ServiceCreate, db: AsyncSession = Depends(get_async_db), _=Depends(verify_token)):
+    return await crud.create_service(db, payload)
+
+@router.patch("/api/services/{service_id}", response_model=schemas.ServiceOut)
+async def update_service(service_id: int, payload: schemas.ServiceUpdate, db: AsyncSession = Depends(get_async_db), _=Depends(verify_token)):
+    svc = await crud.update_service(db, service_id, payload)
+    if not svc:
+        raise HTTPException(status_code=404, detail="Service not found")
+    return svc
+
+@router.delete("/api/services/{service_id}", status_code=204)
+async def delete_service(service_id: int, db: AsyncSession = Depends(get_async_db), _=Depends(verify_token)):
+    if not await crud.delete_service(db, service_id):
+        raise HTTPException(status_code=404, detail="Service not found")
+    return {"ok": True}
+
+# --- Tickets ---
+@router.post("/api/tickets", response_model=schemas.TicketOut, status_code=201,
+             responses={202: {"model": schemas.TicketReceipt, "description": "Spooled (TICKET_SPOOL mode)"}})
+async def submit_ticket(payload: schemas.TicketCreate, db: AsyncSession = Depends(get_async_db)):
+    if TICKET_SPOOL:
+        receipt = await run_in_threadpool(spool.get_spool().submit, payload)
+        return JSONResponse({"receipt": receipt, "status": "queued"}, status_code=202)
+    return await crud.create_ticket(db, payload)
+
+@router.get("/api/tickets", response_model=list[schemas.TicketOut])
+async def admin_list_tickets(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_async_read_db),
+    _=Depends(verify_token),
+):
+    columns = serialize.TICKET_COLUMNS if FAST_JSON else None
+    try:
+        tickets, next_cursor = await crud.get_tickets(db, limit, cursor, status, created_from, created_to, columns, include_archived)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if FAST_JSON:
+        return Response(serialize.TICKETS.dump(tickets), media_type="application/json", headers=headers)
+    response.headers.update(headers)
+    return tickets
+
+@router.get("/api/tickets/stats", response_model=schemas.TicketStats)
+async def ticket_stats(
+    days: int = Query(30, ge=1, le=366),
+    weeks: int = Query(12, ge=1, le=104),
+    db: AsyncSession = Depends(get_async_read_db),
+    _=Depends(verify_token),
+):
+    return await db.run_sync(stats.read, days, weeks)
+
+@router.get("/api/tickets/{ticket_id}", response_model=schemas.TicketOut)
+async def get_ticket(ticket_id: int, db: AsyncSession = Depends(get_async_read_db), _=Depends(verify_token)):
+    ticket = await crud.get_ticket(db, ticket_id)
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return ticket
+
+@router.patch("/api/tickets/{ticket_id}", response_model=schemas.TicketOut)
+async def update_ticket(ticket_id: int, status: str, db: AsyncSession = Depends(get_async_db), _=Depends(verify_token)):
+    ticket = await crud.update_ticket(db, ticket_id, status)
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return ticket
+
+@router.delete("/api/tickets/{ticket_id}", status_code=204)
+async def delete_ticket(ticket_id: int, db: AsyncSession = Depends(get_async_db), _=Depends(verify_token)):
+    if not await crud.delete_ticket(db, ticket_id):
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return {"ok": True}
+
+# --- About ---
+@router.get("/api/about", response_model=schemas.AboutOut)
+async def get_about(request: Request):
+    return await cache.cached_response_async(request, cache.ABOUT, PUBLIC_LOADERS[cache.ABOUT])
+
+@router.put("/api/about", response_model=schemas.AboutOut)
+async def update_about(payload: schemas.AboutCreate, db: AsyncSession = Depends(get_async_db), _=Depends(verify_token)):
+    return await crud.update_about(db, payload)
+
+# --- Leaders ---
+@router.get("/api/leaders", response_model=list[schemas.LeaderOut])
+async def get_leaders(request: Request):
+    return await cache.cached_response_async(request, cache.LEADERS, PUBLIC_LOADERS[cache.LEADERS])
+
+@router.post("/api/leaders", response_model=schemas.LeaderOut, status_code=201)
+async def create_leader(payload: schemas.LeaderCreate, db: AsyncSession = Depends(get_async_db), _=Depends(verify_token)):
+    return await crud.create_leader(db, payload)
+
+@router.patch("/api/leaders/{leader_id}", response_model=schemas.LeaderOut)
+async def update_leader(leader_id: int, payload: schemas.LeaderUpdate, db: AsyncSession = Depends(get_async_db), _=Depends(verify_token)):
+    leader = await crud.update_leader(db, leader_id, payload)
+    if not leader:
+        raise HTTPException(status_code=404, detail="Leader not found")
+    return leader
+
+@router.delete("/api/leaders/{leader_id}", status_code=204)
+async def delete_leader(leader_id: int, db: AsyncSession = Depends(get_async_db), _=Depends(verify_token)):
+    if not await crud.delete_leader(db, leader_id):
+        raise HTTPException(status_code=404, detail="Leader not found")
+    return {"ok": True}
+
+# --- Resources ---
+@router.get("/api/resources", response_model=list[schemas.ResourceOut])
+async def get_resources(request: Request):
+    return await cache.cached_response_async(request, cache.RESOURCES, PUBLIC_LOADERS[cache.RESOURCES])
+
+@router.post("/api/resources", response_model=schemas.ResourceOut, status_code=201)
+async def create_resource(payload: schemas.ResourceCreate, db: AsyncSession = Depends(get_async_db), _=Depends(verify_token)):
+    return await crud.create_resource(db, payload)
+
+@router.patch("/api/resources/{resource_id}", response_model=schemas.ResourceOut)
+async def update_resource(resource_id: int, payload: schemas.ResourceUpdate, db: AsyncSession = Depends(get_async_db), _=Depends(verify_token)):
+    resource = await crud.update_resource(db, resource_id, payload)
+    if not resource:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    return resource
+
+@router.delete("/api/resources/{resource_id}", status_code=204)
+async def delete_resource(resource_id: int, db: AsyncSession = Depends(get_async_db), _=Depends(verify_token)):
+    if not await crud.delete_resource(db, resource_id):
+        raise HTTPException(status_code=404, detail="Resource not found")
+    return {"ok": True}
+
+# --- Partners ---
+@router.get("/api/partners", response_model=list[schemas.PartnerOut])
+async def get_partners(request: Request):
+    return await cache.cached_response_async(request, cache.PARTNERS, PUBLIC_LOADERS[cache.PARTNERS])
+
+@router.post("/api/partners", response_model=schemas.PartnerOut, status_code=201)
+async def create_partner(payload: schemas.PartnerCreate, db: AsyncSession = Depends(get_async_db), _=Depends(verify_token)):
+    return await crud.create_partner(db, payload)
+
+@router.patch("/api/partners/{partner_id}", response_model=schemas.PartnerOut)
+async def update_partner(partner_id: int, payload: schemas.PartnerUpdate, db: AsyncSession = Depends(get_async_db), _=Depends(verify_token)):
+    partner = await crud.update_partner(db, partner_id, payload)
+    if not partner:
+        raise HTTPException(status_code=404, detail="Partner not found")
+    return partner
+
+@router.delete("/api/partners/{partner_id}", status_code=204)
+async def delete_partner(partner_id: int, db: AsyncSession = Depends(get_async_db), _=Depends(verify_token)):
+    if not await crud.delete_partner(db, partner_id):
+        raise HTTPException(status_code=404, detail="Partner not found")
+    return {"ok": True}
@@ -1,7 +1,11 @@
-from typing import Optional
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
 from fastapi import Header, HTTPException, status, Cookie
 import jwt
-from .config import JWT_SECRET, JWT_EXPIRE_MIN, ADMIN_USER, ADMIN_PASS
+from .config import JWT_SECRET, JWT_EXPIRE_MIN, ADMIN_USER, ADMIN_PASS, TOKEN_CACHE_SIZE
 from datetime import datetime, timedelta, timezone
 
 def create_token() -> str:
@@ -14,30 +18,85 @@ def create_token() -> str:
     }
     return jwt.encode(payload, JWT_SECRET, algorithm="HS256")
 
-# ✅ look for the standard Authorization header; also accept a cookie named `token`
-def verify_token(
-    authorization: Optional[str] = Header(None, alias="Authorization"),
-    token_cookie: Optional[str] = Cookie(None, alias="token"),
-):
+# Verified claims keyed by token digest, so repeat checks of the same token skip
+# the HMAC verify; entries expire with the token. Revoked digests are kept until
+# the token would have expired anyway.
+_verified: "OrderedDict[str, dict]" = OrderedDict()
+_revoked: dict[str, float] = {}
+_lock = threading.Lock()
+# Set by broadcast.start() to share revocations with the other workers.
+on_revoke: Optional[Callable[[str, float], None]] = None
+
+def _digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _prune_revoked(now: float):
+    for digest in [d for d, exp in _revoked.items() if exp <= now]:
+        del _revoked[digest]
+
+def extract_token(authorization: Optional[str], token_cookie: Optional[str]) -> Optional[str]:
     token = None
     if authorization:
         parts = authorization.split(" ", 1)
         token = parts[1] if len(parts) == 2 else parts[0]  # supports "Bearer <jwt>" or "<jwt>"
     if not token and token_cookie:
         token = token_cookie
+    return token
+
+def revoke(token: str):
+    try:
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp", 0)
+    except jwt.PyJWTError:
+        return
+    digest = _digest(token)
+    expires_at = exp or time.time() + JWT_EXPIRE_MIN * 60
+    mark_revoked(digest, expires_at)
+    if on_revoke is not None:
+        on_revoke(digest, expires_at)
+
+def mark_revoked(digest: str, expires_at: float):
+    now = time.time()
+    with _lock:
+        _prune_revoked(now)
+        _revoked[digest] = expires_at
+        _verified.pop(digest, None)
+
+# ✅ look for the standard Authorization header; also accept a cookie named `token`
+def verify_token(
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+    token_cookie: Optional[str] = Cookie(None, alias="token"),
+):
+    token = extract_token(authorization, token_cookie)
 
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
 
+    digest = _digest(token)
+    now = time.time()
+    with _lock:
+        if digest in _revoked:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+        claims = _verified.get(digest)
+        if claims is not None:
+            if claims["exp"] > now:
+                _verified.move_to_end(digest)
+                return claims
+            del _verified[digest]
+
     try:
-        decoded = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-        if decoded.get("scope") != "admin":
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-        return decoded
+        decoded = jwt.decode(token, JWT_SECRET, algorithms=["HS256"], options={"require": ["exp"]})
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    if decoded.get("scope") != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+    with _lock:
+        _verified[digest] = decoded
+        if len(_verified) > TOKEN_CACHE_SIZE:
+            _verified.popitem(last=False)
+    return decoded
 
 def authenticate(creds: dict) -> str:
     if creds.get("username") == ADMIN_USER and creds.get("password") == ADMIN_PASS:
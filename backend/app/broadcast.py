@@ -0,0 +1,153 @@
+import logging
+import threading
+import time
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from . import auth, cache, migrations, models
+from .config import CONTENT_SYNC_INTERVAL_MS
+from .db import engine
+
+log = logging.getLogger(__name__)
+
+# Cross-worker propagation of cache invalidations and token revocations.
+#
+# cache.invalidate() and auth.revoke() act locally at once and queue the change
+# here; a publisher thread bumps content_versions / inserts revoked_tokens on
+# the primary. Every worker polls both tables each CONTENT_SYNC_INTERVAL_MS and
+# replays changes it didn't make into its own cache and revocation list, so
+# other workers converge within one interval of the write.
+#
+# The bump is not part of the data transaction: cache.invalidate() runs after
+# the commit and the publisher writes content_versions in its own transaction
+# moments later, so that writes pay no extra statement and a worker that sees
+# a bump always reloads committed rows. The cost: if the process dies (or the
+# primary is unreachable) between the two, the bump is lost and other workers
+# serve the previous content for that key until its next write or their restart.
+#
+# A worker's first poll invalidates every key: whatever it cached before then
+# may predate versions it has never seen.
+
+SYNC_KEYS = migrations.CONTENT_KEYS
+PRUNE_EVERY = 600  # polls between deletes of expired revocations
+
+_cond = threading.Condition()
+_pending_keys: set[str] = set()
+_pending_revocations: dict[str, int] = {}
+_seen: dict[str, int] = {}
+_threads: list[threading.Thread] = []
+_stop = threading.Event()
+
+
+def publish(*keys: str) -> None:
+    with _cond:
+        _pending_keys.update(k for k in keys if k in SYNC_KEYS)
+        _cond.notify()
+
+
+def publish_revocation(digest: str, expires_at: float) -> None:
+    with _cond:
+        _pending_revocations[digest] = int(expires_at)
+        _cond.notify()
+
+
+def _bump(conn, keys: set[str]) -> None:
+    table = models.ContentVersion
+    result = conn.execute(update(table).where(table.key.in_(keys)).values(version=table.version + 1))
+    if result.rowcount < len(keys):
+        present = set(conn.scalars(select(table.key).where(table.key.in_(keys))))
+        conn.execute(insert(table), [{"key": k, "version": 1} for k in keys - present])
+
+
+def _publish_pending() -> None:
+    with _cond:
+        keys, revocations = set(_pending_keys), dict(_pending_revocations)
+        _pending_keys.clear()
+        _pending_revocations.clear()
+    try:
+        with engine.begin() as conn:
+            if keys:
+                _bump(conn, keys)
+            for digest, expires_at in revocations.items():
+                try:
+                    with conn.begin_nested():
+                        conn.execute(insert(models.RevokedToken).values(digest=digest, expires_at=expires_at))
+                except IntegrityError:
+                    pass
+    except Exception:
+        with _cond:
+            _pending_keys.update(keys)
+            for digest, expires_at in revocations.items():
+                _pending_revocations.setdefault(digest, expires_at)
+        raise
+
+
+def _run_publisher() -> None:
+    while not _stop.is_set():
+        with _cond:
+            _cond.wait_for(lambda: _pending_keys or _pending_revocations or _stop.is_set())
+        if _stop.is_set() and not (_pending_keys or _pending_revocations):
+            return
+        try:
+            _publish_pending()
+        except Exception as e:
+            log.warning("content version publish failed (%s); retrying", e)
+            _stop.wait(1)
+
+
+def poll_once(prune: bool = False) -> None:
+    now = int(time.time())
+    with engine.begin() as conn:
+        versions = dict(conn.execute(select(models.ContentVersion.key, models.ContentVersion.version)).all())
+        revoked = conn.execute(
+            select(models.RevokedToken.digest, models.RevokedToken.expires_at).where(models.RevokedToken.expires_at > now)
+        ).all()
+        if prune:
+            conn.execute(delete(models.RevokedToken).where(models.RevokedToken.expires_at <= now))
+    # A key not seen before counts as changed, so the first poll drops everything.
+    changed = [k for k, v in versions.items() if _seen.get(k) != v]
+    _seen.update(versions)
+    if changed:
+        cache.content_cache.invalidate(*changed)
+    for digest, expires_at in revoked:
+        auth.mark_revoked(digest, expires_at)
+
+
+def _run_poller() -> None:
+    while not migrations.schema_ready.wait(0.5):
+        if _stop.is_set():
+            return
+    polls = 0
+    try:
+        poll_once()
+    except Exception as e:
+        log.warning("content version poll failed: %s", e)
+    while not _stop.wait(CONTENT_SYNC_INTERVAL_MS / 1000):
+        polls += 1
+        try:
+            poll_once(prune=polls % PRUNE_EVERY == 0)
+        except Exception as e:
+            log.warning("content version poll failed: %s", e)
+
+
+def start() -> None:
+    if not CONTENT_SYNC_INTERVAL_MS or _threads:
+        return
+    _stop.clear()
+    if publish not in cache.listeners:
+        cache.listeners.append(publish)
+    auth.on_revoke = publish_revocation
+    for target, name in ((_run_publisher, "content-publisher"), (_run_poller, "content-poller")):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        _threads.append(thread)
+
+
+def stop() -> None:
+    _stop.set()
+    with _cond:
+        _cond.notify_all()
+    for thread in _threads:
+        thread.join(timeout=5)
+    _threads.clear()
@@ -0,0 +1,165 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import threading
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+
+# Public content keys; each one maps to a GET endpoint and is invalidated by
+# the matching crud.create_*/update_*/delete_* call.
+SERVICES = "services"
+ABOUT = "about"
+LEADERS = "leaders"
+RESOURCES = "resources"
+PARTNERS = "partners"
+PUBLIC_KEYS = (SERVICES, ABOUT, LEADERS, RESOURCES, PARTNERS)
+# Aggregate of every public key for /api/site; dropped whenever any of them is.
+SITE = "site"
+
+GZIP_MIN_BYTES = 1024
+
+
+class CacheEntry:
+    __slots__ = ("body", "etag", "gzip_body", "gzip_etag")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.gzip_body = self.gzip_etag = None
+        if len(body) >= GZIP_MIN_BYTES:
+            self.gzip_body = gzip.compress(body, compresslevel=6)
+            self.gzip_etag = self.etag[:-1] + '-gzip"'
+
+
+class ContentCache:
+    def __init__(self):
+        self._entries: dict[str, CacheEntry] = {}
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._fill_locks: dict[str, threading.Lock] = {}
+        # Only touched from the event loop's thread, so no guard of their own.
+        self._async_fill_locks: dict[str, asyncio.Lock] = {}
+
+    def _fill_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._fill_locks.setdefault(key, threading.Lock())
+
+    def get(self, key: str, loader: Callable[[], object]) -> CacheEntry:
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+        # One loader per key at a time so a cold cache doesn't stampede the DB.
+        with self._fill_lock(key):
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry
+            version = self._versions.get(key, 0)
+            return self._store(key, version, CacheEntry(_encode(loader())))
+
+    async def aget(self, key: str, loader: Callable[[], Awaitable[object]]) -> CacheEntry:
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+        lock = self._async_fill_locks.get(key)
+        if lock is None:
+            lock = self._async_fill_locks[key] = asyncio.Lock()
+        async with lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry
+            version = self._versions.get(key, 0)
+            return self._store(key, version, CacheEntry(_encode(await loader())))
+
+    def _store(self, key: str, version: int, entry: CacheEntry) -> CacheEntry:
+        with self._lock:
+            # A write that landed while we were loading makes this result stale.
+            if self._versions.get(key, 0) == version:
+                self._entries[key] = entry
+        return entry
+
+    def version(self, key: str) -> int:
+        return self._versions.get(key, 0)
+
+    def invalidate(self, *keys: str) -> None:
+        if any(key in PUBLIC_KEYS for key in keys):
+            keys = keys + (SITE,)
+        with self._lock:
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._versions[key] = self._versions.get(key, 0) + 1
+            self._entries.clear()
+
+
+def _encode(data: object) -> bytes:
+    if isinstance(data, bytes):
+        return data
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cached_response(request: Request, key: str, loader: Callable[[], object]) -> Response:
+    return _respond(request, content_cache.get(key, loader))
+
+
+async def cached_response_async(request: Request, key: str, loader: Callable[[], Awaitable[object]]) -> Response:
+    return _respond(request, await content_cache.aget(key, loader))
+
+
+def assemble_site(sections: dict[str, Optional[CacheEntry]]) -> bytes:
+    # Splice the already-encoded section bodies together instead of re-serializing them.
+    parts = [json.dumps(key).encode() + b":" + (entry.body if entry else b"null") for key, entry in sections.items()]
+    return b"{" + b",".join(parts) + b"}"
+
+
+def _accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() == "gzip":
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def _respond(request: Request, entry: CacheEntry) -> Response:
+    use_gzip = entry.gzip_body is not None and _accepts_gzip(request)
+    etag = entry.gzip_etag if use_gzip else entry.etag
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=entry.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+content_cache = ContentCache()
+
+# Called with the keys after the local entries are dropped: cross-worker sync
+# (broadcast.py) and static snapshots (snapshots.py) register here.
+listeners: list[Callable[..., None]] = []
+
+
+def invalidate(*keys: str) -> None:
+    content_cache.invalidate(*keys)
+    for listener in listeners:
+        listener(*keys)
@@ -11,11 +11,88 @@ CORS_ORIGINS = [o.strip() for o in os.getenv("CORS_ORIGINS", "*").split(",")]
 USER_ENC = quote_plus(DB_USER)
 PASS_ENC = quote_plus(DB_PASS)
 
-DATABASE_URL = (
-    f"mysql+pymysql://{USER_ENC}:{PASS_ENC}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4"
+DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    f"mysql+pymysql://{USER_ENC}:{PASS_ENC}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4",
 )
 
+# Connection pool per engine (primary and each replica).
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+
+# Read replicas for read-only routes (comma-separated URLs). A client that just
+# wrote reads from the primary for READ_YOUR_WRITES_S seconds.
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+READ_YOUR_WRITES_S = int(os.getenv("READ_YOUR_WRITES_S", "10"))
+
+# Apply pending schema migrations in a background thread at boot. Set to 0 when
+# `python -m app.migrations` runs as a separate deploy step.
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "1").lower() in ("1", "true", "yes")
+
+# Multi-worker consistency: how often each worker polls content_versions and
+# revoked_tokens for changes made by the others (0 disables; single process only).
+CONTENT_SYNC_INTERVAL_MS = int(os.getenv("CONTENT_SYNC_INTERVAL_MS", "1000"))
+
+# Directory nginx serves the public endpoints from as static JSON (empty disables).
+STATIC_PUBLISH_DIR = os.getenv("STATIC_PUBLISH_DIR", "")
+
+# Async engine mode: routes await an AsyncSession instead of blocking a threadpool worker.
+DB_ASYNC = os.getenv("DB_ASYNC", "0").lower() in ("1", "true", "yes")
+_ASYNC_DRIVERS = {"mysql+pymysql": "mysql+aiomysql", "mysql": "mysql+aiomysql", "sqlite": "sqlite+aiosqlite"}
+
+def _async_url(url: str) -> str:
+    scheme, _, rest = url.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+ASYNC_DATABASE_REPLICA_URLS = [_async_url(u) for u in DATABASE_REPLICA_URLS]
+
+# Column-select + TypeAdapter list serialization and orjson responses.
+FAST_JSON = os.getenv("FAST_JSON", "0").lower() in ("1", "true", "yes")
+
+# Write-behind ticket submission: spool locally, flush to the DB in batches.
+TICKET_SPOOL = os.getenv("TICKET_SPOOL", "0").lower() in ("1", "true", "yes")
+TICKET_SPOOL_PATH = os.getenv("TICKET_SPOOL_PATH", "/var/lib/it-service/ticket-spool.db")
+TICKET_SPOOL_INTERVAL_MS = int(os.getenv("TICKET_SPOOL_INTERVAL_MS", "200"))
+TICKET_SPOOL_BATCH = int(os.getenv("TICKET_SPOOL_BATCH", "500"))
+
+# Hot/archive split: tickets in one of these statuses for longer than
+# TICKET_ARCHIVE_AFTER_DAYS move to tickets_archive, TICKET_ARCHIVE_BATCH rows per
+# transaction, every TICKET_ARCHIVE_INTERVAL_S in the background (0 = CLI only).
+TICKET_ARCHIVE_STATUSES = tuple(s.strip() for s in os.getenv("TICKET_ARCHIVE_STATUSES", "closed,resolved").split(",") if s.strip())
+TICKET_ARCHIVE_AFTER_DAYS = int(os.getenv("TICKET_ARCHIVE_AFTER_DAYS", "180"))
+TICKET_ARCHIVE_BATCH = int(os.getenv("TICKET_ARCHIVE_BATCH", "1000"))
+TICKET_ARCHIVE_INTERVAL_S = int(os.getenv("TICKET_ARCHIVE_INTERVAL_S", "3600"))
+
+# Admission control for the unauthenticated write endpoints (per client IP + global cap).
+RATE_LIMIT_TICKETS_PER_MIN = float(os.getenv("RATE_LIMIT_TICKETS_PER_MIN", "6"))
+RATE_LIMIT_TICKETS_BURST = int(os.getenv("RATE_LIMIT_TICKETS_BURST", "5"))
+RATE_LIMIT_LOGIN_PER_MIN = float(os.getenv("RATE_LIMIT_LOGIN_PER_MIN", "10"))
+RATE_LIMIT_LOGIN_BURST = int(os.getenv("RATE_LIMIT_LOGIN_BURST", "5"))
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "16"))
+# nginx sets X-Real-IP / X-Forwarded-For. They are honoured only when enabled and
+# the connection comes from TRUSTED_PROXIES (CIDRs); from anyone else they would
+# let a client pick the address the rate limits key on.
+TRUST_PROXY_HEADERS = os.getenv("TRUST_PROXY_HEADERS", "0").lower() in ("1", "true", "yes")
+TRUSTED_PROXIES = [c.strip() for c in os.getenv("TRUSTED_PROXIES", "127.0.0.1/32,::1/128").split(",") if c.strip()]
+
+# Admin-only "X-Profile: 1" request profiling, and slow statements logged with their EXPLAIN plan.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0").lower() in ("1", "true", "yes")
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "1"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))  # 0 disables
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "100"))
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "../web/frontend/src/assets")
+UPLOAD_URL_PREFIX = os.getenv("UPLOAD_URL_PREFIX", "/src/assets").rstrip("/")
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+IMAGE_WIDTHS = tuple(int(w) for w in os.getenv("IMAGE_WIDTHS", "320,640,1280").split(","))
+IMAGE_FORMATS = tuple(f.strip().lower() for f in os.getenv("IMAGE_FORMATS", "avif,webp").split(","))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
 ADMIN_USER = os.getenv("ADMIN_USER", "admin")
 ADMIN_PASS = os.getenv("ADMIN_PASS", "change-me")
 JWT_SECRET = os.getenv("JWT_SECRET", "change-this-secret")
 JWT_EXPIRE_MIN = int(os.getenv("JWT_EXPIRE_MIN", "240"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
@@ -0,0 +1,253 @@
+import argparse
+import csv
+import io
+import json
+import sys
+from decimal import Decimal
+from typing import Iterator, NamedTuple, Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import cache, models, schemas
+from .db import ReadSession, SessionLocal
+
+# Bulk import/export of the public site content.
+#
+# An import document is {"services": [...], "leaders": [...], "resources": [...],
+# "partners": [...], "about": {...}} (any subset), or a CSV of one kind. Every
+# row is validated before the DB is touched; then, in one transaction, each kind
+# costs one SELECT of its natural keys, one multi-row upsert by id for rows that
+# already exist and one multi-row INSERT for the rest. Unique-constraint
+# violations (a service name taken by another slug) roll the whole import back.
+# Exports stream the same shape back out, so they re-import unchanged.
+
+
+class Kind(NamedTuple):
+    model: type
+    schema: type[BaseModel]
+    key: str  # natural key the upsert matches on
+    cache_key: str
+
+
+KINDS = {
+    "services": Kind(models.Service, schemas.ServiceCreate, "slug", cache.SERVICES),
+    "leaders": Kind(models.Leader, schemas.LeaderCreate, "name", cache.LEADERS),
+    "resources": Kind(models.Resource, schemas.ResourceCreate, "title", cache.RESOURCES),
+    "partners": Kind(models.Partner, schemas.PartnerCreate, "name", cache.PARTNERS),
+}
+EXPORT_BATCH = 500
+
+_adapters = {name: TypeAdapter(list[kind.schema]) for name, kind in KINDS.items()}
+
+
+def columns(kind: str) -> list[str]:
+    return list(KINDS[kind].schema.model_fields)
+
+
+def _errors(e: ValidationError, *prefix) -> list[dict]:
+    return [{"loc": [*prefix, *err["loc"]], "msg": err["msg"], "type": err["type"]} for err in e.errors()]
+
+
+def validate(document: dict) -> dict:
+    # One pass over the whole document; every problem is reported together.
+    if not isinstance(document, dict):
+        raise HTTPException(status_code=422, detail=[{"loc": [], "msg": "Expected a JSON object", "type": "dict_type"}])
+    errors, parsed = [], {}
+    for name in document:
+        if name not in KINDS and name != "about":
+            errors.append({"loc": [name], "msg": f"Unknown content kind; expected one of {', '.join([*KINDS, 'about'])}", "type": "extra_forbidden"})
+    if document.get("about") is not None:
+        try:
+            parsed["about"] = schemas.AboutCreate.model_validate(document["about"])
+        except ValidationError as e:
+            errors += _errors(e, "about")
+    for name, kind in KINDS.items():
+        if name not in document:
+            continue
+        try:
+            rows = _adapters[name].validate_python(document[name])
+        except ValidationError as e:
+            errors += _errors(e, name)
+            continue
+        seen = {}
+        for i, row in enumerate(rows):
+            key = getattr(row, kind.key)
+            if key in seen:
+                errors.append({"loc": [name, i, kind.key], "msg": f"Duplicate {kind.key} (also row {seen[key]})", "type": "duplicate"})
+            seen.setdefault(key, i)
+        parsed[name] = rows
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+    return parsed
+
+
+def parse_csv(kind: str, text: str) -> dict:
+    if kind not in KINDS:
+        raise HTTPException(status_code=400, detail=f"CSV imports need a kind, one of {', '.join(KINDS)}")
+    reader = csv.DictReader(io.StringIO(text))
+    # Empty cells are NULLs, so optional columns can be left blank.
+    return {kind: [{k: (v if v != "" else None) for k, v in row.items() if k} for row in reader]}
+
+
+def _upsert_by_id(db: Session, model, rows: list[dict]) -> None:
+    dialect = db.get_bind().dialect.name
+    cols = [c for c in rows[0] if c != "id"]
+    if dialect == "mysql":
+        stmt = mysql.insert(model)
+        stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in cols})
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(model)
+        stmt = stmt.on_conflict_do_update(index_elements=[model.id], set_={c: stmt.excluded[c] for c in cols})
+    else:
+        _update_then_insert(db, model, rows)
+        return
+    db.execute(stmt, rows)
+
+
+def _update_then_insert(db: Session, model, rows: list[dict]) -> None:
+    # Any dialect: update by id, then insert the rows deleted since they were selected.
+    table = model.__table__
+    db.execute(update(table).where(table.c.id == bindparam("row_id")),
+               [{**{c: v for c, v in r.items() if c != "id"}, "row_id": r["id"]} for r in rows])
+    present = set(db.scalars(select(model.id).where(model.id.in_([r["id"] for r in rows]))))
+    missing = [r for r in rows if r["id"] not in present]
+    if missing:
+        db.execute(insert(model), missing)
+
+
+def _import_kind(db: Session, kind: Kind, rows: list[BaseModel]) -> dict:
+    model = kind.model
+    key_col = getattr(model, kind.key)
+    ids = {}
+    for key, row_id in db.execute(select(key_col, model.id).order_by(model.id)):
+        ids.setdefault(key, row_id)  # leaders/partners may already repeat a name; the oldest row wins
+    updates, inserts = [], []
+    for row in rows:
+        values = row.model_dump()
+        row_id = ids.get(values[kind.key])
+        if row_id is None:
+            inserts.append(values)
+        else:
+            updates.append({"id": row_id, **values})
+    if updates:
+        _upsert_by_id(db, model, updates)
+    if inserts:
+        db.execute(insert(model), inserts)
+    return {"inserted": len(inserts), "updated": len(updates)}
+
+
+def import_content(db: Session, parsed: dict) -> dict:
+    result, keys = {}, []
+    try:
+        for name, kind in KINDS.items():
+            if name in parsed:
+                result[name] = _import_kind(db, kind, parsed[name])
+                keys.append(kind.cache_key)
+        if "about" in parsed:
+            about = db.scalars(select(models.About).limit(1)).first()
+            if about is None:
+                db.add(models.About(content=parsed["about"].content))
+                result["about"] = {"inserted": 1, "updated": 0}
+            else:
+                about.content = parsed["about"].content
+                result["about"] = {"inserted": 0, "updated": 1}
+            keys.append(cache.ABOUT)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=f"Import conflicts with existing content: {e.orig}")
+    if keys:
+        cache.invalidate(*keys)
+    return result
+
+
+def _json_default(value):
+    return float(value) if isinstance(value, Decimal) else str(value)
+
+
+def _rows(db: Session, kind: str) -> Iterator[list]:
+    model = KINDS[kind].model
+    stmt = select(*(getattr(model, c) for c in columns(kind))).order_by(model.id)
+    yield from db.execute(stmt.execution_options(yield_per=EXPORT_BATCH)).partitions()
+
+
+def export_json(primary: bool = False) -> Iterator[str]:
+    # Owns its session, like the ticket export: the body outlives the request scope.
+    with ReadSession(primary) as db:
+        about = db.scalars(select(models.About.content).limit(1)).first()
+        yield '{"about":' + (json.dumps({"content": about}, ensure_ascii=False) if about is not None else "null")
+        for name in KINDS:
+            cols = columns(name)
+            yield f',"{name}":['
+            first = True
+            for batch in _rows(db, name):
+                chunk = ",".join(json.dumps(dict(zip(cols, row)), default=_json_default, ensure_ascii=False) for row in batch)
+                yield chunk if first else "," + chunk
+                first = False
+            yield "]"
+        yield "}\n"
+
+
+def export_csv(kind: str, primary: bool = False) -> Iterator[str]:
+    with ReadSession(primary) as db:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(columns(kind))
+        yield buf.getvalue()
+        for batch in _rows(db, kind):
+            buf.seek(0)
+            buf.truncate()
+            writer.writerows(batch)
+            yield buf.getvalue()
+
+
+def load(text: str, fmt: str = "json", kind: Optional[str] = None) -> dict:
+    if fmt == "csv":
+        return validate(parse_csv(kind, text))
+    try:
+        document = json.loads(text)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+    if kind is not None:
+        document = {kind: document}
+    return validate(document)
+
+
+def import_raw(db: Session, raw: bytes, fmt: str = "json", kind: Optional[str] = None) -> dict:
+    # Decoding, parsing and validating a large document is CPU-bound, so the
+    # API runs all of it, and the import, in one threadpool call.
+    try:
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Import must be UTF-8")
+    return import_content(db, load(text, fmt, kind))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import or export the public site content.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="Validate and upsert a JSON document or a CSV of one kind.")
+    imp.add_argument("file", help="path, or - for stdin")
+    imp.add_argument("--kind", choices=list(KINDS), help="required for CSV; for JSON, the file is a bare list of that kind")
+    exp = sub.add_parser("export", help="Write the current content to stdout.")
+    exp.add_argument("--kind", choices=list(KINDS), help="export one kind as CSV")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "import":
+            with (sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")) as f:
+                text = f.read()
+            fmt = "csv" if args.file.endswith(".csv") else "json"
+            parsed = load(text, fmt, args.kind)
+            with SessionLocal() as db:
+                print(json.dumps(import_content(db, parsed)))
+        else:
+            for chunk in export_csv(args.kind, True) if args.kind else export_json(True):
+                sys.stdout.write(chunk)
+    except HTTPException as e:
+        raise SystemExit(json.dumps(e.detail, indent=1) if isinstance(e.detail, list) else str(e.detail))
@@ -1,187 +1,238 @@
+import base64
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import and_, case, delete, func, or_, select, union_all, update
 from sqlalchemy.orm import Session
-from . import models, schemas
+from . import models, repository, schemas, stats
+from .models import ticket_time
+from .config import TICKET_ARCHIVE_STATUSES
 
 # --- Services ---
 def get_services(db: Session):
     return db.query(models.Service).order_by(models.Service.created_at.desc()).all()
 
 def create_service(db: Session, data: schemas.ServiceCreate):
-    svc = models.Service(
-        name=data.name,
-        slug=data.slug,
-        description=data.description,
-        price=data.price,
-    )
-    db.add(svc)
-    db.commit()
-    db.refresh(svc)
-    return svc
+    return repository.SERVICES.create(db, data.model_dump())
 
 def get_service(db: Session, service_id: int):
     return db.query(models.Service).filter(models.Service.id == service_id).first()
 
-def update_service(db: Session, service_id: int, data: schemas.ServiceCreate):
-    svc = db.query(models.Service).filter(models.Service.id == service_id).first()
-    if svc:
-        svc.name = data.name
-        svc.slug = data.slug
-        svc.description = data.description
-        svc.price = data.price
-        db.commit()
-        db.refresh(svc)
-    return svc
+def update_service(db: Session, service_id: int, data: schemas.ServiceUpdate):
+    return repository.SERVICES.update(db, service_id, data.model_dump(exclude_unset=True))
 
 def delete_service(db: Session, service_id: int):
-    svc = db.query(models.Service).filter(models.Service.id == service_id).first()
-    if svc:
-        db.delete(svc)
-        db.commit()
-    return svc
+    return repository.SERVICES.delete(db, service_id)
 
 # --- Tickets ---
 def create_ticket(db: Session, data: schemas.TicketCreate):
-    t = models.Ticket(
-        name=data.name,
-        email=data.email,
-        subject=data.subject,
-        message=data.message,
-        status="open",
-    )
-    db.add(t)
-    db.commit()
-    db.refresh(t)
+    t = repository.TICKETS.create(db, {**data.model_dump(), "status": "open"}, commit=False)
+    stats.added(db, t)
+    repository.TICKETS.commit(db)
     return t
 
-def get_tickets(db: Session):
-    return db.query(models.Ticket).order_by(models.Ticket.created_at.desc()).all()
+def encode_ticket_cursor(t: models.Ticket) -> str:
+    raw = f"{t.created_at.isoformat()}|{t.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_ticket_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, ticket_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(ticket_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+def filter_tickets(stmt, status: Optional[str] = None, created_from: Optional[datetime] = None,
+                   created_to: Optional[datetime] = None, model=models.Ticket):
+    T = model
+    if status:
+        stmt = stmt.where(T.status == status)
+    if created_from:
+        stmt = stmt.where(ticket_time(T.created_at) >= ticket_time(created_from))
+    if created_to:
+        stmt = stmt.where(ticket_time(T.created_at) < ticket_time(created_to))
+    return stmt
+
+def _keyset(stmt, model, after: Optional[tuple[datetime, int]], limit: int):
+    T = model
+    if after:
+        created_at, ticket_id = after
+        key, after_key = ticket_time(T.created_at), ticket_time(created_at)
+        # Expanded row comparison so MySQL can range-scan (status, created_at, id).
+        stmt = stmt.where(or_(key < after_key, and_(key == after_key, T.id < ticket_id)))
+    return stmt.order_by(ticket_time(T.created_at).desc(), T.id.desc()).limit(limit + 1)
+
+def tickets_page_stmt(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    columns: Optional[list] = None,
+    include_archived: bool = False,
+):
+    after = decode_ticket_cursor(cursor) if cursor else None
+    if not include_archived:
+        T = models.Ticket
+        stmt = filter_tickets(select(*columns) if columns else select(T), status, created_from, created_to)
+        return _keyset(stmt, T, after, limit)
+    # One page from each table, each on its own keyset index, merged into one.
+    names = [c.key for c in columns] if columns else TICKET_EXPORT_COLUMNS
+    pages = []
+    for model in (models.Ticket, models.TicketArchive):
+        stmt = filter_tickets(select(*(getattr(model, n) for n in names)), status, created_from, created_to, model)
+        page = _keyset(stmt, model, after, limit).subquery()
+        pages.append(select(*page.c))
+    both = union_all(*pages).subquery()
+    return select(*both.c).order_by(ticket_time(both.c.created_at).desc(), both.c.id.desc()).limit(limit + 1)
+
+def tickets_page(rows: list, limit: int):
+    next_cursor = encode_ticket_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+def get_tickets(db: Session, limit: int = 50, cursor: Optional[str] = None, status: Optional[str] = None,
+                created_from: Optional[datetime] = None, created_to: Optional[datetime] = None,
+                columns: Optional[list] = None, include_archived: bool = False):
+    stmt = tickets_page_stmt(limit, cursor, status, created_from, created_to, columns, include_archived)
+    result = db.execute(stmt) if columns or include_archived else db.scalars(stmt)
+    return tickets_page(result.all(), limit)
+
+TICKET_EXPORT_COLUMNS = ("id", "name", "email", "subject", "message", "status", "created_at")
+
+def iter_ticket_batches(db: Session, batch_size: int = 1000, status: Optional[str] = None,
+                        created_from: Optional[datetime] = None, created_to: Optional[datetime] = None,
+                        include_archived: bool = False):
+    # Plain column tuples over a server-side cursor: no ORM identity map, bounded memory.
+    # Archived tickets follow the live ones, each table in id order.
+    for model in (models.Ticket, models.TicketArchive) if include_archived else (models.Ticket,):
+        stmt = select(*(getattr(model, c) for c in TICKET_EXPORT_COLUMNS))
+        stmt = filter_tickets(stmt, status, created_from, created_to, model).order_by(model.id)
+        result = db.execute(stmt.execution_options(yield_per=batch_size))
+        yield from result.partitions()
 
 def get_ticket(db: Session, ticket_id: int):
-    return db.query(models.Ticket).filter(models.Ticket.id == ticket_id).first()
+    # Old closed tickets live in tickets_archive (see archive.py).
+    return db.get(models.Ticket, ticket_id) or db.get(models.TicketArchive, ticket_id)
+
+def closed_at_for(old_status: Optional[str], status: str, closed_at):
+    # Keep the first close time; reopening clears it.
+    if status not in TICKET_ARCHIVE_STATUSES:
+        return None
+    return closed_at if old_status in TICKET_ARCHIVE_STATUSES else func.now()
 
 def update_ticket(db: Session, ticket_id: int, status: str):
-    t = db.query(models.Ticket).filter(models.Ticket.id == ticket_id).first()
-    if t:
-        t.status = status
-        db.commit()
-        db.refresh(t)
+    # The old status is needed for ticket_stats, so this one write keeps a locking read.
+    T = models.Ticket
+    old = db.execute(select(T.status, T.closed_at).where(T.id == ticket_id).with_for_update()).first()
+    if old is None:
+        return _update_archived_ticket(db, ticket_id, status)
+    values = {"status": status, "closed_at": closed_at_for(old.status, status, old.closed_at)}
+    t = repository.TICKETS.update(db, ticket_id, values, commit=False)
+    stats.moved(db, t, old.status)
+    repository.TICKETS.commit(db)
+    return t
+
+def _update_archived_ticket(db: Session, ticket_id: int, status: str):
+    # A status that still qualifies for the archive is changed in place;
+    # reopening moves the ticket back to the live table, id and all.
+    A = models.TicketArchive
+    old = db.execute(select(*A.__table__.c).where(A.id == ticket_id).with_for_update()).first()
+    if old is None:
+        return None
+    if status in TICKET_ARCHIVE_STATUSES:
+        t = repository.TICKET_ARCHIVE.update(db, ticket_id, {"status": status}, commit=False)
+    else:
+        repository.TICKET_ARCHIVE.delete(db, ticket_id, commit=False)
+        values = {c.name: old._mapping[c.name] for c in models.Ticket.__table__.c if c.name in old._mapping}
+        t = repository.TICKETS.create(db, {**values, "status": status, "closed_at": None}, commit=False)
+    stats.moved(db, t, old.status)
+    repository.TICKETS.commit(db)
     return t
 
 def delete_ticket(db: Session, ticket_id: int):
-    t = db.query(models.Ticket).filter(models.Ticket.id == ticket_id).first()
+    t = (repository.TICKETS.delete(db, ticket_id, commit=False, fetch=True)
+         or repository.TICKET_ARCHIVE.delete(db, ticket_id, commit=False, fetch=True))
     if t:
-        db.delete(t)
-        db.commit()
+        stats.removed(db, t)
+        repository.TICKETS.commit(db)
     return t
 
+def _ticket_match(match: schemas.TicketFilter):
+    T = models.Ticket
+    conds = []
+    if match.ids is not None:
+        conds.append(T.id.in_(match.ids))
+    if match.status is not None:
+        conds.append(T.status == match.status)
+    if match.older_than_days is not None:
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=match.older_than_days)
+        conds.append(ticket_time(T.created_at) < ticket_time(cutoff))
+    return conds
+
+def bulk_update_tickets(db: Session, match: schemas.TicketFilter, status: str) -> int:
+    conds = _ticket_match(match)
+    stats.status_changed(db, stats.rows_removed(db, conds), status)
+    T = models.Ticket
+    if status in TICKET_ARCHIVE_STATUSES:
+        closed_at = case((T.status.in_(TICKET_ARCHIVE_STATUSES), T.closed_at), else_=func.now())
+    else:
+        closed_at = None
+    stmt = update(T).where(*conds).values(status=status, closed_at=closed_at)
+    result = db.execute(stmt.execution_options(synchronize_session=False))
+    db.commit()
+    return result.rowcount
+
+def bulk_delete_tickets(db: Session, match: schemas.TicketFilter) -> int:
+    conds = _ticket_match(match)
+    stats.rows_removed(db, conds)
+    stmt = delete(models.Ticket).where(*conds)
+    result = db.execute(stmt.execution_options(synchronize_session=False))
+    db.commit()
+    return result.rowcount
+
 # --- About ---
 def get_about(db: Session):
     return db.query(models.About).first()
 
 def update_about(db: Session, data: schemas.AboutCreate):
-    about = db.query(models.About).first()
-    if not about:
-        about = models.About(content=data.content)
-        db.add(about)
-    else:
-        about.content = data.content
-    db.commit()
-    db.refresh(about)
-    return about
+    # Singleton row: update whatever is there, insert on first use.
+    return repository.ABOUT.update_where(db, data.model_dump()) or repository.ABOUT.create(db, data.model_dump())
 
 # --- Leaders ---
 def get_leaders(db: Session):
     return db.query(models.Leader).all()
 
 def create_leader(db: Session, data: schemas.LeaderCreate):
-    leader = models.Leader(
-        name=data.name,
-        photo=data.photo,
-        bio=data.bio,
-    )
-    db.add(leader)
-    db.commit()
-    db.refresh(leader)
-    return leader
-
-def update_leader(db: Session, leader_id: int, data: schemas.LeaderCreate):
-    leader = db.query(models.Leader).filter(models.Leader.id == leader_id).first()
-    if leader:
-        leader.name = data.name
-        leader.photo = data.photo
-        leader.bio = data.bio
-        db.commit()
-        db.refresh(leader)
-    return leader
+    return repository.LEADERS.create(db, data.model_dump())
+
+def update_leader(db: Session, leader_id: int, data: schemas.LeaderUpdate):
+    return repository.LEADERS.update(db, leader_id, data.model_dump(exclude_unset=True))
 
 def delete_leader(db: Session, leader_id: int):
-    leader = db.query(models.Leader).filter(models.Leader.id == leader_id).first()
-    if leader:
-        db.delete(leader)
-        db.commit()
-    return leader
+    return repository.LEADERS.delete(db, leader_id)
 
 # --- Resources ---
 def get_resources(db: Session):
     return db.query(models.Resource).all()
 
 def create_resource(db: Session, data: schemas.ResourceCreate):
-    resource = models.Resource(
-        title=data.title,
-        description=data.description,
-        type=data.type,
-        url=data.url,
-    )
-    db.add(resource)
-    db.commit()
-    db.refresh(resource)
-    return resource
-
-def update_resource(db: Session, resource_id: int, data: schemas.ResourceCreate):
-    resource = db.query(models.Resource).filter(models.Resource.id == resource_id).first()
-    if resource:
-        resource.title = data.title
-        resource.description = data.description
-        resource.type = data.type
-        resource.url = data.url
-        db.commit()
-        db.refresh(resource)
-    return resource
+    return repository.RESOURCES.create(db, data.model_dump())
+
+def update_resource(db: Session, resource_id: int, data: schemas.ResourceUpdate):
+    return repository.RESOURCES.update(db, resource_id, data.model_dump(exclude_unset=True))
 
 def delete_resource(db: Session, resource_id: int):
-    resource = db.query(models.Resource).filter(models.Resource.id == resource_id).first()
-    if resource:
-        db.delete(resource)
-        db.commit()
-    return resource
+    return repository.RESOURCES.delete(db, resource_id)
 
 # --- Partners ---
 def get_partners(db: Session):
     return db.query(models.Partner).all()
 
 def create_partner(db: Session, data: schemas.PartnerCreate):
-    partner = models.Partner(
-        name=data.name,
-        logo=data.logo,
-        link=data.link,
-    )
-    db.add(partner)
-    db.commit()
-    db.refresh(partner)
-    return partner
-
-def update_partner(db: Session, partner_id: int, data: schemas.PartnerCreate):
-    partner = db.query(models.Partner).filter(models.Partner.id == partner_id).first()
-    if partner:
-        partner.name = data.name
-        partner.logo = data.logo
-        partner.link = data.link
-        db.commit()
-        db.refresh(partner)
-    return partner
+    return repository.PARTNERS.create(db, data.model_dump())
+
+def update_partner(db: Session, partner_id: int, data: schemas.PartnerUpdate):
+    return repository.PARTNERS.update(db, partner_id, data.model_dump(exclude_unset=True))
 
 def delete_partner(db: Session, partner_id: int):
-    partner = db.query(models.Partner).filter(models.Partner.id == partner_id).first()
-    if partner:
-        db.delete(partner)
-        db.commit()
-    return partner
+    return repository.PARTNERS.delete(db, partner_id)
@@ -0,0 +1,95 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import crud, models, schemas
+from .crud import tickets_page_stmt, tickets_page
+
+# Async mirror of crud.py for DB_ASYNC mode; keep the two in step.
+
+async def _write(db: AsyncSession, fn, *args):
+    # Writes share crud.py's single-statement repository code on the sync side of the session.
+    return await db.run_sync(fn, *args)
+
+# --- Services ---
+async def get_services(db: AsyncSession):
+    return (await db.scalars(select(models.Service).order_by(models.Service.created_at.desc()))).all()
+
+async def create_service(db: AsyncSession, data: schemas.ServiceCreate):
+    return await _write(db, crud.create_service, data)
+
+async def get_service(db: AsyncSession, service_id: int):
+    return await db.get(models.Service, service_id)
+
+async def update_service(db: AsyncSession, service_id: int, data: schemas.ServiceUpdate):
+    return await _write(db, crud.update_service, service_id, data)
+
+async def delete_service(db: AsyncSession, service_id: int):
+    return await _write(db, crud.delete_service, service_id)
+
+# --- Tickets ---
+async def create_ticket(db: AsyncSession, data: schemas.TicketCreate):
+    return await _write(db, crud.create_ticket, data)
+
+async def get_tickets(db: AsyncSession, limit: int = 50, cursor: Optional[str] = None, status: Optional[str] = None,
+                      created_from: Optional[datetime] = None, created_to: Optional[datetime] = None,
+                      columns: Optional[list] = None, include_archived: bool = False):
+    stmt = tickets_page_stmt(limit, cursor, status, created_from, created_to, columns, include_archived)
+    result = await db.execute(stmt) if columns or include_archived else await db.scalars(stmt)
+    return tickets_page(result.all(), limit)
+
+async def get_ticket(db: AsyncSession, ticket_id: int):
+    return await db.get(models.Ticket, ticket_id) or await db.get(models.TicketArchive, ticket_id)
+
+async def update_ticket(db: AsyncSession, ticket_id: int, status: str):
+    return await _write(db, crud.update_ticket, ticket_id, status)
+
+async def delete_ticket(db: AsyncSession, ticket_id: int):
+    return await _write(db, crud.delete_ticket, ticket_id)
+
+# --- About ---
+async def get_about(db: AsyncSession):
+    return (await db.scalars(select(models.About).limit(1))).first()
+
+async def update_about(db: AsyncSession, data: schemas.AboutCreate):
+    return await _write(db, crud.update_about, data)
+
+# --- Leaders ---
+async def get_leaders(db: AsyncSession):
+    return (await db.scalars(select(models.Leader))).all()
+
+async def create_leader(db: AsyncSession, data: schemas.LeaderCreate):
+    return await _write(db, crud.create_leader, data)
+
+async def update_leader(db: AsyncSession, leader_id: int, data: schemas.LeaderUpdate):
+    return await _write(db, crud.update_leader, leader_id, data)
+
+async def delete_leader(db: AsyncSession, leader_id: int):
+    return await _write(db, crud.delete_leader, leader_id)
+
+# --- Resources ---
+async def get_resources(db: AsyncSession):
+    return (await db.scalars(select(models.Resource))).all()
+
+async def create_resource(db: AsyncSession, data: schemas.ResourceCreate):
+    return await _write(db, crud.create_resource, data)
+
+async def update_resource(db: AsyncSession, resource_id: int, data: schemas.ResourceUpdate):
+    return await _write(db, crud.update_resource, resource_id, data)
+
+async def delete_resource(db: AsyncSession, resource_id: int):
+    return await _write(db, crud.delete_resource, resource_id)
+
+# --- Partners ---
+async def get_partners(db: AsyncSession):
+    return (await db.scalars(select(models.Partner))).all()
+
+async def create_partner(db: AsyncSession, data: schemas.PartnerCreate):
+    return await _write(db, crud.create_partner, data)
+
+async def update_partner(db: AsyncSession, partner_id: int, data: schemas.PartnerUpdate):
+    return await _write(db, crud.update_partner, partner_id, data)
+
+async def delete_partner(db: AsyncSession, partner_id: int):
+    return await _write(db, crud.delete_partner, partner_id)
+
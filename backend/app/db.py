@@ -1,14 +1,49 @@
+import itertools
+import time
+from fastapi import Request
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-from .config import DATABASE_URL
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from .config import (
+    DATABASE_REPLICA_URLS, DATABASE_URL, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_SIZE, DB_POOL_TIMEOUT,
+)
+from .metrics import TimedQueuePool
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True, pool_recycle=3600)
+def _create_engine(url):
+    return create_engine(
+        url, pool_pre_ping=True, pool_recycle=DB_POOL_RECYCLE, poolclass=TimedQueuePool,
+        pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT,
+    )
+
+engine = _create_engine(DATABASE_URL)
+replica_engines = [_create_engine(url) for url in DATABASE_REPLICA_URLS]
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+_replicas = itertools.cycle(replica_engines or [engine])
+
+# Set on responses to writes; while it is in the future the client reads from the primary.
+STICKY_COOKIE = "db_primary_until"
+
+def ReadSession(primary: bool = False) -> Session:
+    return SessionLocal(bind=engine if primary else next(_replicas))
+
+def wants_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+# For read-only routes: round-robin over replicas unless the client just wrote.
+def get_read_db(request: Request):
+    db = ReadSession(wants_primary(request))
+    try:
+        yield db
+    finally:
+        db.close()
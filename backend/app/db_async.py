@@ -0,0 +1,29 @@
+import itertools
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from .config import ASYNC_DATABASE_REPLICA_URLS, ASYNC_DATABASE_URL, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_SIZE, DB_POOL_TIMEOUT
+from .db import wants_primary
+
+def _create_async_engine(url: str):
+    # aiosqlite gets a NullPool, which takes no sizing arguments.
+    pool_args = {} if url.startswith("sqlite") else {
+        "pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_timeout": DB_POOL_TIMEOUT,
+    }
+    return create_async_engine(url, pool_pre_ping=True, pool_recycle=DB_POOL_RECYCLE, **pool_args)
+
+async_engine = _create_async_engine(ASYNC_DATABASE_URL)
+async_replica_engines = [_create_async_engine(url) for url in ASYNC_DATABASE_REPLICA_URLS]
+# Rows are serialized after commit, so keep them loaded instead of lazily re-fetching.
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+_replicas = itertools.cycle(async_replica_engines or [async_engine])
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# For read-only routes, as db.get_read_db: replicas unless the client just wrote.
+async def get_async_read_db(request: Request):
+    bind = async_engine if wants_primary(request) else next(_replicas)
+    async with AsyncSessionLocal(bind=bind) as db:
+        yield db
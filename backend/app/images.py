@@ -0,0 +1,94 @@
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from . import cache, uploads
+from .config import IMAGE_FORMATS, IMAGE_WIDTHS, IMAGE_WORKERS
+
+log = logging.getLogger(__name__)
+
+# Upload categories that get resized variants, and the cached content they feed.
+# Only these have an image column whose schema exposes the variants
+# (LeaderOut.photo_variants, PartnerOut.logo_variants).
+CATEGORIES = {"leaders": cache.LEADERS, "partners": cache.PARTNERS}
+MIME_TYPES = {"webp": "image/webp", "avif": "image/avif"}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def manifest_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".variants.json"
+
+
+def build_variants(src_path: str, url: str, widths: tuple[int, ...], formats: tuple[str, ...]) -> list[dict]:
+    # Runs in a worker process; Pillow is only needed there.
+    from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+    try:
+        img = Image.open(src_path)
+        img = ImageOps.exif_transpose(img)
+    except UnidentifiedImageError:
+        return []  # SVGs, PDFs and other non-raster uploads are served as-is
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "transparency" in img.info or img.mode in ("LA", "P") else "RGB")
+
+    targets = sorted({w for w in widths if w < img.width} or {img.width})
+    stem, url_stem = os.path.splitext(src_path)[0], os.path.splitext(url)[0]
+    variants = []
+    for fmt in formats:
+        if not features.check(fmt):
+            continue
+        for width in targets:
+            height = max(1, round(img.height * width / img.width))
+            out = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+            suffix = f"-{width}w.{fmt}"
+            out.save(stem + suffix, fmt.upper(), quality=80)
+            variants.append({"url": url_stem + suffix, "width": width, "type": MIME_TYPES[fmt]})
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(src_path), prefix=".variants-")
+    with os.fdopen(fd, "w") as f:
+        json.dump(variants, f)
+    os.replace(tmp, manifest_path(src_path))
+    return variants
+
+
+def variants_for(url: Optional[str]) -> list[dict]:
+    path = uploads.url_to_path(url)
+    if not path:
+        return []
+    try:
+        with open(manifest_path(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def schedule(url: str, category: str) -> None:
+    global _pool
+    path = uploads.url_to_path(url)
+    if category not in CATEGORIES or not path or os.path.exists(manifest_path(path)):
+        return
+    if _pool is None:
+        # Spawn, not fork: this process runs threads (DB pools, pollers) whose
+        # locks a forked child could inherit mid-acquire and deadlock on.
+        _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    future = _pool.submit(build_variants, path, url, IMAGE_WIDTHS, IMAGE_FORMATS)
+
+    def done(f):
+        if f.exception():
+            log.warning("image variants failed for %s: %s", url, f.exception())
+        else:
+            cache.invalidate(CATEGORIES[category])
+
+    future.add_done_callback(done)
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -1,17 +1,26 @@
+import csv
+import io
+import json
 import time
-from fastapi import FastAPI, Depends, HTTPException, status, File, UploadFile
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import FastAPI, Cookie, Depends, Header, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-import os
-import shutil
 
-from .db import Base, engine, get_db
-from . import schemas, crud, models
-from .config import CORS_ORIGINS
-from .auth import authenticate, verify_token
+from .db import ReadSession, STICKY_COOKIE, SessionLocal, engine, get_db, get_read_db, replica_engines, wants_primary
+from . import schemas, crud, repository, cache, content, media, uploads, images, serialize, spool, ratelimit, metrics, profiling, migrations, broadcast, snapshots, stats, archive, search as search_index
+from .config import CORS_ORIGINS, DB_ASYNC, FAST_JSON, MIGRATE_ON_STARTUP, READ_YOUR_WRITES_S, TICKET_SPOOL, UPLOAD_MAX_BYTES, UPLOAD_URL_PREFIX
+from .auth import authenticate, extract_token, revoke, verify_token
 
-app = FastAPI(title="IT Tech Service API", version="1.1.0")
+app = FastAPI(
+    title="IT Tech Service API",
+    version="1.1.0",
+    default_response_class=ORJSONResponse if FAST_JSON else JSONResponse,
+)
 
 # CORS
 app.add_middleware(
@@ -20,98 +29,309 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
-def _init_db(max_wait=60):
-    start = time.time()
-    while True:
-        try:
-            Base.metadata.create_all(bind=engine)
-            break
-        except Exception:
-            if time.time() - start > max_wait:
-                raise
-            time.sleep(2)
+if replica_engines:
+    @app.middleware("http")
+    async def read_your_writes(request: Request, call_next):
+        response = await call_next(request)
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            response.set_cookie(STICKY_COOKIE, str(time.time() + READ_YOUR_WRITES_S),
+                                max_age=READ_YOUR_WRITES_S, httponly=True, samesite="lax")
+        return response
+
+app.middleware("http")(ratelimit.admission_middleware)
+app.add_middleware(profiling.ProfilingMiddleware)
+
+# Unique-constraint conflicts from the data layer (sync and async routes).
+@app.exception_handler(repository.ConflictError)
+async def conflict_error(request: Request, exc: repository.ConflictError):
+    return JSONResponse({"detail": str(exc)}, status_code=400)
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    # Refuse a declared oversize body before reading any of it; uploads.save_upload
+    # enforces the same limit on the bytes themselves (chunked bodies included).
+    if request.url.path.startswith("/upload/"):
+        length = request.headers.get("content-length")
+        if length and length.isdigit() and int(length) > UPLOAD_MAX_BYTES + uploads.FORM_OVERHEAD:
+            return JSONResponse({"detail": "File too large"}, status_code=413)
+    return await call_next(request)
+
+# Outermost, so its timings and counts include the other middleware's responses
+# (413s, admission rejections). Keep this the last middleware registered.
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_engine(engine)
+profiling.instrument_engine(engine)
+for i, replica in enumerate(replica_engines):
+    metrics.instrument_engine(replica, f"replica{i}")
+    profiling.instrument_engine(replica)
+metrics.add_collector("admission_rejected_total", "Requests rejected by admission control.", ("reason", "limiter"), lambda: {
+    **{("rate", name): n for name, n in ratelimit.stats()["rate_limited"].items()},
+    ("concurrency", "global"): ratelimit.gate.rejected,
+}, kind="counter")
 
 @app.on_event("startup")
 def on_startup():
-    _init_db()
+    # Never block on the DB here: /api/ready turns 200 once migrations finish.
+    if MIGRATE_ON_STARTUP:
+        migrations.migrate_in_background()
+    else:
+        migrations.schema_ready.set()
+    broadcast.start()
+    archive.start()
+    if TICKET_SPOOL:
+        spool.get_spool().start()
+
+@app.on_event("shutdown")
+def on_shutdown_spool():
+    if TICKET_SPOOL:
+        spool.get_spool().stop()
+    broadcast.stop()
+    archive.stop()
+
+def _load_list(fetch, schema, fast):
+    with SessionLocal() as db:
+        if FAST_JSON:
+            return fast.fetch(db)
+        return [schema.model_validate(row).model_dump(mode="json") for row in fetch(db)]
+
+def _load_about():
+    with SessionLocal() as db:
+        about = crud.get_about(db)
+        if not about:
+            raise HTTPException(status_code=404, detail="About not found")
+        return schemas.AboutOut.model_validate(about).model_dump(mode="json")
+
+PUBLIC_LOADERS = {
+    cache.SERVICES: lambda: _load_list(crud.get_services, schemas.ServiceOut, serialize.SERVICES),
+    cache.ABOUT: _load_about,
+    cache.LEADERS: lambda: _load_list(crud.get_leaders, schemas.LeaderOut, serialize.LEADERS),
+    cache.RESOURCES: lambda: _load_list(crud.get_resources, schemas.ResourceOut, serialize.RESOURCES),
+    cache.PARTNERS: lambda: _load_list(crud.get_partners, schemas.PartnerOut, serialize.PARTNERS),
+}
+
+def _load_site():
+    sections = {}
+    for key, loader in PUBLIC_LOADERS.items():
+        try:
+            sections[key] = cache.content_cache.get(key, loader)
+        except HTTPException:
+            sections[key] = None  # e.g. no About row yet
+    return cache.assemble_site(sections)
+
+@app.on_event("startup")
+def on_startup_snapshots():
+    snapshots.start({**PUBLIC_LOADERS, cache.SITE: _load_site})
+
+@app.on_event("shutdown")
+def on_shutdown_images():
+    images.shutdown()
 
+@app.get("/api/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# Liveness: the process is serving. Never touches the DB.
 @app.get("/api/health")
 def health():
     return {"status": "ok"}
 
+# Readiness: schema migrated and a pooled connection answers.
+@app.get("/api/ready")
+def ready():
+    if not migrations.schema_ready.is_set():
+        return JSONResponse({"status": "migrating"}, status_code=503)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return JSONResponse({"status": "db unavailable", "detail": type(e).__name__}, status_code=503)
+    return {"status": "ready"}
+
+# --- Site snapshot ---
+@app.get("/api/site", response_model=schemas.SiteOut)
+def get_site(request: Request):
+    return cache.cached_response(request, cache.SITE, _load_site)
+
+# --- Search ---
+@app.get("/api/search", response_model=schemas.SearchResults)
+def search(
+    q: str = Query(..., min_length=2, max_length=200),
+    scope: Literal["services", "resources", "tickets"] = "services",
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+    token_cookie: Optional[str] = Cookie(None, alias="token"),
+    db: Session = Depends(get_read_db),
+):
+    if search_index.SCOPES[scope].admin_only:
+        verify_token(authorization, token_cookie)
+    hits = search_index.search(db, scope, q, limit, offset)
+    next_offset = offset + limit if len(hits) > limit else None
+    return {"scope": scope, "items": hits[:limit], "next_offset": next_offset}
+
+# --- Content bulk import/export ---
+@app.post("/api/content/import", response_model=dict[str, schemas.ImportCounts])
+async def import_content(
+    request: Request,
+    kind: Optional[Literal["services", "leaders", "resources", "partners"]] = None,
+    db: Session = Depends(get_db),
+    _=Depends(verify_token),
+):
+    # JSON document (see content.py), or text/csv with ?kind=.
+    body = await uploads.read_body(request, UPLOAD_MAX_BYTES, "Import too large")
+    fmt = "csv" if request.headers.get("content-type", "").startswith("text/csv") else "json"
+    return await run_in_threadpool(content.import_raw, db, body, fmt, kind)
+
+@app.get("/api/content/export")
+def export_content(
+    request: Request,
+    kind: Optional[Literal["services", "leaders", "resources", "partners"]] = None,
+    _=Depends(verify_token),
+):
+    # Every kind as one JSON document, or a single kind as CSV.
+    primary = wants_primary(request)
+    if kind:
+        return StreamingResponse(content.export_csv(kind, primary), media_type="text/csv",
+                                 headers={"Content-Disposition": f'attachment; filename="{kind}.csv"'})
+    return StreamingResponse(content.export_json(primary), media_type="application/json",
+                             headers={"Content-Disposition": 'attachment; filename="content.json"'})
+
 # --- File Upload Endpoint ---
-UPLOAD_DIR = "../web/frontend/src/assets"
-
-def save_upload_file(upload_file: UploadFile, subdir: str):
-    os.makedirs(os.path.join(UPLOAD_DIR, subdir), exist_ok=True)
-    file_location = os.path.join(UPLOAD_DIR, subdir, upload_file.filename)
-    with open(file_location, "wb") as buffer:
-        shutil.copyfileobj(upload_file.file, buffer)
-    # Return relative path for frontend use
-    return f"/src/assets/{subdir}/{upload_file.filename}"
-
-@app.post("/upload/{category}")
-async def upload_file(category: str, file: UploadFile = File(...)):
-    allowed = ["leaders", "partners", "services", "aboutus", "resources"]
-    if category not in allowed:
+UPLOAD_FORM = {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+    "type": "object", "required": ["file"], "properties": {"file": {"type": "string", "format": "binary"}}}}}}}
+
+@app.post("/upload/{category}", openapi_extra=UPLOAD_FORM)
+async def upload_file(category: str, request: Request):
+    if category not in uploads.CATEGORIES:
         return JSONResponse({"error": "Invalid category"}, status_code=400)
-    url = save_upload_file(file, category)
+    url = await uploads.save_upload(request, category)
+    images.schedule(url, category)
     return {"url": url}
 
+# Uploaded files; nginx serves these itself when it shares the uploads volume.
+@app.api_route(UPLOAD_URL_PREFIX + "/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+def serve_upload(path: str, request: Request):
+    return media.serve(request, path)
+
 # --- Services ---
 @app.get("/api/services", response_model=list[schemas.ServiceOut])
-def list_services(db: Session = Depends(get_db)):
-    return crud.get_services(db)
+def list_services(request: Request):
+    return cache.cached_response(request, cache.SERVICES, PUBLIC_LOADERS[cache.SERVICES])
 
 @app.post("/api/services", response_model=schemas.ServiceOut, status_code=201)
 def add_service(payload: schemas.ServiceCreate, db: Session = Depends(get_db), _=Depends(verify_token)):
-    existing = db.query(models.Service).filter(
-        (models.Service.name == payload.name) | (models.Service.slug == payload.slug)
-    ).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Service name or slug already exists")
     return crud.create_service(db, payload)
 
 @app.patch("/api/services/{service_id}", response_model=schemas.ServiceOut)
-def update_service(service_id: int, payload: schemas.ServiceCreate, db: Session = Depends(get_db), _=Depends(verify_token)):
-    svc = db.query(models.Service).get(service_id)
+def update_service(service_id: int, payload: schemas.ServiceUpdate, db: Session = Depends(get_db), _=Depends(verify_token)):
+    svc = crud.update_service(db, service_id, payload)
     if not svc:
         raise HTTPException(status_code=404, detail="Service not found")
-    conflict = db.query(models.Service).filter(
-        ((models.Service.name == payload.name) | (models.Service.slug == payload.slug)) & (models.Service.id != service_id)
-    ).first()
-    if conflict:
-        raise HTTPException(status_code=400, detail="Service name or slug already exists")
-    svc.name = payload.name
-    svc.slug = payload.slug
-    svc.description = payload.description
-    svc.price = payload.price
-    db.commit()
-    db.refresh(svc)
     return svc
 
 @app.delete("/api/services/{service_id}", status_code=204)
 def delete_service(service_id: int, db: Session = Depends(get_db), _=Depends(verify_token)):
-    svc = db.query(models.Service).get(service_id)
+    svc = crud.delete_service(db, service_id)
     if not svc:
         raise HTTPException(status_code=404, detail="Service not found")
-    db.delete(svc)
-    db.commit()
     return {"ok": True}
 
 # --- Tickets ---
-@app.post("/api/tickets", response_model=schemas.TicketOut, status_code=201)
+@app.post("/api/tickets", response_model=schemas.TicketOut, status_code=201,
+          responses={202: {"model": schemas.TicketReceipt, "description": "Spooled (TICKET_SPOOL mode)"}})
 def submit_ticket(payload: schemas.TicketCreate, db: Session = Depends(get_db)):
+    if TICKET_SPOOL:
+        receipt = spool.get_spool().submit(payload)
+        return JSONResponse({"receipt": receipt, "status": "queued"}, status_code=202)
     return crud.create_ticket(db, payload)
 
 @app.get("/api/tickets", response_model=list[schemas.TicketOut])
-def admin_list_tickets(db: Session = Depends(get_db), _=Depends(verify_token)):
-    return crud.get_tickets(db)
+def admin_list_tickets(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    include_archived: bool = False,
+    db: Session = Depends(get_read_db),
+    _=Depends(verify_token),
+):
+    columns = serialize.TICKET_COLUMNS if FAST_JSON else None
+    try:
+        tickets, next_cursor = crud.get_tickets(db, limit, cursor, status, created_from, created_to, columns, include_archived)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if FAST_JSON:
+        return Response(serialize.TICKETS.dump(tickets), media_type="application/json", headers=headers)
+    response.headers.update(headers)
+    return tickets
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+def _export_tickets(fmt: str, status: Optional[str], created_from: Optional[datetime], created_to: Optional[datetime],
+                    include_archived: bool, primary: bool):
+    # Owns its session: the request-scoped one is closed before the body is streamed.
+    with ReadSession(primary) as db:
+        if fmt == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(crud.TICKET_EXPORT_COLUMNS)
+            yield buf.getvalue()
+        for batch in crud.iter_ticket_batches(db, status=status, created_from=created_from, created_to=created_to,
+                                              include_archived=include_archived):
+            if fmt == "csv":
+                buf.seek(0)
+                buf.truncate()
+                writer.writerows(batch)
+                yield buf.getvalue()
+            else:
+                yield "".join(
+                    json.dumps(dict(zip(crud.TICKET_EXPORT_COLUMNS, row)), default=_json_default, ensure_ascii=False) + "\n"
+                    for row in batch
+                )
+
+@app.get("/api/tickets/export")
+def export_tickets(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    include_archived: bool = True,
+    _=Depends(verify_token),
+):
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_tickets(format, status, created_from, created_to, include_archived, wants_primary(request)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="tickets.{format}"'},
+    )
+
+@app.patch("/api/tickets/bulk", response_model=schemas.BulkResult)
+def bulk_update_tickets(payload: schemas.TicketBulkUpdate, db: Session = Depends(get_db), _=Depends(verify_token)):
+    return {"affected": crud.bulk_update_tickets(db, payload.match, payload.status)}
+
+@app.post("/api/tickets/bulk-delete", response_model=schemas.BulkResult)
+def bulk_delete_tickets(payload: schemas.TicketFilter, db: Session = Depends(get_db), _=Depends(verify_token)):
+    return {"affected": crud.bulk_delete_tickets(db, payload)}
+
+@app.get("/api/tickets/stats", response_model=schemas.TicketStats)
+def ticket_stats(
+    days: int = Query(30, ge=1, le=366),
+    weeks: int = Query(12, ge=1, le=104),
+    db: Session = Depends(get_read_db),
+    _=Depends(verify_token),
+):
+    return stats.read(db, days, weeks)
 
 @app.get("/api/tickets/{ticket_id}", response_model=schemas.TicketOut)
-def get_ticket(ticket_id: int, db: Session = Depends(get_db), _=Depends(verify_token)):
+def get_ticket(ticket_id: int, db: Session = Depends(get_read_db), _=Depends(verify_token)):
     ticket = crud.get_ticket(db, ticket_id)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
@@ -133,11 +353,8 @@ def delete_ticket(ticket_id: int, db: Session = Depends(get_db), _=Depends(verif
 
 # --- About ---
 @app.get("/api/about", response_model=schemas.AboutOut)
-def get_about(db: Session = Depends(get_db)):
-    about = crud.get_about(db)
-    if not about:
-        raise HTTPException(status_code=404, detail="About not found")
-    return about
+def get_about(request: Request):
+    return cache.cached_response(request, cache.ABOUT, PUBLIC_LOADERS[cache.ABOUT])
 
 @app.put("/api/about", response_model=schemas.AboutOut)
 def update_about(payload: schemas.AboutCreate, db: Session = Depends(get_db), _=Depends(verify_token)):
@@ -145,15 +362,15 @@ def update_about(payload: schemas.AboutCreate, db: Session = Depends(get_db), _=
 
 # --- Leaders ---
 @app.get("/api/leaders", response_model=list[schemas.LeaderOut])
-def get_leaders(db: Session = Depends(get_db)):
-    return crud.get_leaders(db)
+def get_leaders(request: Request):
+    return cache.cached_response(request, cache.LEADERS, PUBLIC_LOADERS[cache.LEADERS])
 
 @app.post("/api/leaders", response_model=schemas.LeaderOut, status_code=201)
 def create_leader(payload: schemas.LeaderCreate, db: Session = Depends(get_db), _=Depends(verify_token)):
     return crud.create_leader(db, payload)
 
 @app.patch("/api/leaders/{leader_id}", response_model=schemas.LeaderOut)
-def update_leader(leader_id: int, payload: schemas.LeaderCreate, db: Session = Depends(get_db), _=Depends(verify_token)):
+def update_leader(leader_id: int, payload: schemas.LeaderUpdate, db: Session = Depends(get_db), _=Depends(verify_token)):
     leader = crud.update_leader(db, leader_id, payload)
     if not leader:
         raise HTTPException(status_code=404, detail="Leader not found")
@@ -168,15 +385,15 @@ def delete_leader(leader_id: int, db: Session = Depends(get_db), _=Depends(verif
 
 # --- Resources ---
 @app.get("/api/resources", response_model=list[schemas.ResourceOut])
-def get_resources(db: Session = Depends(get_db)):
-    return crud.get_resources(db)
+def get_resources(request: Request):
+    return cache.cached_response(request, cache.RESOURCES, PUBLIC_LOADERS[cache.RESOURCES])
 
 @app.post("/api/resources", response_model=schemas.ResourceOut, status_code=201)
 def create_resource(payload: schemas.ResourceCreate, db: Session = Depends(get_db), _=Depends(verify_token)):
     return crud.create_resource(db, payload)
 
 @app.patch("/api/resources/{resource_id}", response_model=schemas.ResourceOut)
-def update_resource(resource_id: int, payload: schemas.ResourceCreate, db: Session = Depends(get_db), _=Depends(verify_token)):
+def update_resource(resource_id: int, payload: schemas.ResourceUpdate, db: Session = Depends(get_db), _=Depends(verify_token)):
     resource = crud.update_resource(db, resource_id, payload)
     if not resource:
         raise HTTPException(status_code=404, detail="Resource not found")
@@ -191,15 +408,15 @@ def delete_resource(resource_id: int, db: Session = Depends(get_db), _=Depends(v
 
 # --- Partners ---
 @app.get("/api/partners", response_model=list[schemas.PartnerOut])
-def get_partners(db: Session = Depends(get_db)):
-    return crud.get_partners(db)
+def get_partners(request: Request):
+    return cache.cached_response(request, cache.PARTNERS, PUBLIC_LOADERS[cache.PARTNERS])
 
 @app.post("/api/partners", response_model=schemas.PartnerOut, status_code=201)
 def create_partner(payload: schemas.PartnerCreate, db: Session = Depends(get_db), _=Depends(verify_token)):
     return crud.create_partner(db, payload)
 
 @app.patch("/api/partners/{partner_id}", response_model=schemas.PartnerOut)
-def update_partner(partner_id: int, payload: schemas.PartnerCreate, db: Session = Depends(get_db), _=Depends(verify_token)):
+def update_partner(partner_id: int, payload: schemas.PartnerUpdate, db: Session = Depends(get_db), _=Depends(verify_token)):
     partner = crud.update_partner(db, partner_id, payload)
     if not partner:
         raise HTTPException(status_code=404, detail="Partner not found")
@@ -212,8 +429,48 @@ def delete_partner(partner_id: int, db: Session = Depends(get_db), _=Depends(ver
         raise HTTPException(status_code=404, detail="Partner not found")
     return {"ok": True}
 
+@app.get("/api/admission")
+def admission_stats(_=Depends(verify_token)):
+    return ratelimit.stats()
+
+@app.get("/api/debug/slow-queries")
+def slow_queries(_=Depends(verify_token)):
+    return list(reversed(profiling.slow_queries))
+
 # --- Auth ---
 @app.post("/api/auth/login")
 def login(creds: dict):
     token = authenticate(creds)
-    return {"token": token}
\ No newline at end of file
+    return {"token": token}
+
+@app.post("/api/auth/logout", status_code=204)
+def logout(
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+    token_cookie: Optional[str] = Cookie(None, alias="token"),
+    _=Depends(verify_token),
+):
+    revoke(extract_token(authorization, token_cookie))
+
+# --- Async DB mode ---
+if DB_ASYNC:
+    from fastapi.routing import APIRoute
+    from . import async_routes
+    from .db_async import async_engine, async_replica_engines
+
+    _async_keys = {(r.path, m) for r in async_routes.router.routes for m in r.methods}
+    app.router.routes = [
+        r for r in app.router.routes
+        if not (isinstance(r, APIRoute) and any((r.path, m) in _async_keys for m in r.methods))
+    ]
+    app.include_router(async_routes.router)
+    metrics.instrument_engine(async_engine.sync_engine, "async")
+    profiling.instrument_engine(async_engine.sync_engine)
+    for i, replica in enumerate(async_replica_engines):
+        metrics.instrument_engine(replica.sync_engine, f"async_replica{i}")
+        profiling.instrument_engine(replica.sync_engine)
+
+    @app.on_event("shutdown")
+    async def on_shutdown():
+        await async_engine.dispose()
+        for replica in async_replica_engines:
+            await replica.dispose()
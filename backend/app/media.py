@@ -0,0 +1,147 @@
+import mimetypes
+import os
+import re
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+import anyio
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import FileResponse
+
+from . import cache, uploads
+from .config import UPLOAD_DIR, UPLOAD_URL_PREFIX
+
+# Serves uploaded files under UPLOAD_URL_PREFIX. In the compose stack nginx
+# answers these from the shared uploads volume with sendfile and only misses
+# reach here; in development this is the only server for them.
+#
+# Upload names are content hashes (uploads.BlobWriter), and so are their image
+# variants, so those are cached for a year as immutable; anything else is
+# revalidated. ETags use nginx's "<mtime>-<size>" hex form, so a validator from
+# either server is accepted by the other. Single byte ranges get a 206; a
+# multi-range request gets the whole file, which HTTP allows.
+#
+# The backend never uses sendfile. Starlette 0.38 (pinned by FastAPI 0.115) has
+# no Range support in FileResponse, so RangeFileResponse reads the slice in
+# chunk_size pieces through anyio, as FileResponse does for whole files;
+# uvicorn offers no zero-copy send either way. sendfile is nginx's job. With
+# Starlette >= 0.39, FileResponse handles Range itself and can replace this.
+
+FINGERPRINTED = re.compile(r"^[0-9a-f]{64}(-\d+w)?\.[a-z0-9]{1,8}$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+# Uploads are unauthenticated: never let one run as a page on our origin (SVG, HTML).
+SANDBOX = {"X-Content-Type-Options": "nosniff", "Content-Security-Policy": "default-src 'none'; style-src 'unsafe-inline'; sandbox"}
+
+mimetypes.add_type("image/avif", ".avif")
+mimetypes.add_type("image/webp", ".webp")
+
+
+def _resolve(rel: str) -> Optional[str]:
+    if any(part.startswith(".") for part in rel.split("/")):
+        return None  # in-progress temp files, and no traversal
+    path = uploads.url_to_path(f"{UPLOAD_URL_PREFIX}/{rel}")
+    if not path:
+        return None
+    root = os.path.realpath(UPLOAD_DIR)
+    path = os.path.realpath(path)
+    return path if path.startswith(root + os.sep) else None
+
+
+def etag_for(st: os.stat_result) -> str:
+    return f'"{int(st.st_mtime):x}-{st.st_size:x}"'
+
+
+def _not_modified(request: Request, etag: str, st: os.stat_result) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return cache.etag_matches(if_none_match, etag)
+    since = request.headers.get("if-modified-since")
+    if since:
+        try:
+            return int(st.st_mtime) <= parsedate_to_datetime(since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def parse_range(header: Optional[str], size: int):
+    # (start, end) inclusive for a single satisfiable range; None to send the
+    # whole file; raises 416 when nothing in the range exists.
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, sep, last = header[6:].strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first == "":
+            length = int(last)
+            if length <= 0:
+                raise ValueError
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+            if last and int(last) < start:
+                return None
+    except ValueError:
+        return None
+    if start >= size:
+        raise HTTPException(status_code=416, detail="Range not satisfiable",
+                            headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+class RangeFileResponse(FileResponse):
+    def __init__(self, path: str, start: int, end: int, st: os.stat_result, headers: dict, media_type: Optional[str]):
+        headers = {**headers, "Content-Length": str(end - start + 1), "Content-Range": f"bytes {start}-{end}/{st.st_size}"}
+        super().__init__(path, status_code=206, headers=headers, media_type=media_type, stat_result=st)
+        self.start, self.end = start, end
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        remaining = self.end - self.start + 1
+        async with await anyio.open_file(self.path, mode="rb") as f:
+            await f.seek(self.start)
+            while remaining:
+                chunk = await f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def serve(request: Request, rel: str) -> Response:
+    path = _resolve(rel)
+    try:
+        st = os.stat(path) if path else None
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
+        raise HTTPException(status_code=404, detail="Not found")
+
+    etag = etag_for(st)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Cache-Control": IMMUTABLE if FINGERPRINTED.match(os.path.basename(path)) else REVALIDATE,
+        "Accept-Ranges": "bytes",
+        **SANDBOX,
+    }
+    if _not_modified(request, etag, st):
+        return Response(status_code=304, headers=headers)
+
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if_range = request.headers.get("if-range")
+    # A stale If-Range (ETag or date) means "send it all", not "send that slice".
+    if not if_range or if_range == etag or if_range == headers["Last-Modified"]:
+        byte_range = parse_range(request.headers.get("range"), st.st_size)
+        if byte_range:
+            return RangeFileResponse(path, *byte_range, st, headers, media_type)
+    return FileResponse(path, headers=headers, media_type=media_type, stat_result=st)
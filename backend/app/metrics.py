@@ -0,0 +1,203 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1e4, 1e5, 1e6, 5e6, 1e7, 2.5e7, 1e8)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self.values: dict[tuple, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            items = list(self.values.items())
+        for labels, value in items:
+            yield self.name + _fmt_labels(self.labels, labels), value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self.values: dict[tuple, list] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(labels)
+            if state is None:
+                state = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][idx] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        with self.lock:
+            items = [(labels, (list(s[0]), s[1], s[2])) for labels, s in self.values.items()]
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                yield self.name + "_bucket" + _fmt_labels(self.labels, labels, f'le="{le}"'), cumulative
+            yield self.name + "_sum" + _fmt_labels(self.labels, labels), total
+            yield self.name + "_count" + _fmt_labels(self.labels, labels), count
+
+
+# Sampled at scrape time from a callback; kind is "gauge" or "counter".
+class Collector:
+    def __init__(self, name: str, help: str, labels: tuple, read: Callable[[], dict], kind: str = "gauge"):
+        self.name, self.help, self.labels, self.read, self.kind = name, help, labels, read, kind
+
+    def samples(self):
+        for labels, value in self.read().items():
+            yield self.name + _fmt_labels(self.labels, labels), value
+
+
+REGISTRY: list = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, value in metric.samples():
+            lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+REQUESTS = register(Counter("http_requests_total", "HTTP requests by route, method and status.", ("route", "method", "status")))
+REQUEST_LATENCY = register(Histogram("http_request_duration_seconds", "Request latency by route.", ("route", "method")))
+DB_QUERIES = register(Histogram("db_queries_per_request", "SQL statements issued per request.", ("route",), COUNT_BUCKETS))
+DB_TIME = register(Histogram("db_time_per_request_seconds", "Time spent in SQL per request.", ("route",)))
+DB_STATEMENTS = register(Counter("db_statements_total", "SQL statements executed.", ()))
+DB_STATEMENT_TIME = register(Histogram("db_statement_duration_seconds", "SQL statement latency.", ()))
+POOL_WAIT = register(Histogram("db_pool_checkout_wait_seconds", "Time waiting for a pooled connection.", ()))
+UPLOAD_BYTES = register(Counter("upload_bytes_total", "Bytes received by /upload.", ("category",)))
+UPLOAD_DURATION = register(Histogram("upload_duration_seconds", "Time to store an upload.", ("category",)))
+UPLOAD_SIZE = register(Histogram("upload_size_bytes", "Size of stored uploads.", ("category",), SIZE_BUCKETS))
+POOL_CONNECTIONS = register(Collector("db_pool_connections", "Pool connections by state.", ("engine", "state"), lambda: _pool_states()))
+
+# [statement count, seconds] for the request being served; the threadpool copies
+# the context, so sync routes update the same list.
+_request_db: ContextVar[Optional[list]] = ContextVar("request_db", default=None)
+
+
+class TimedQueuePool(QueuePool):
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - t0)
+
+
+_pools: dict[str, object] = {}
+
+
+def _pool_states() -> dict:
+    states = {}
+    for name, engine in _pools.items():
+        pool = engine.pool
+        states[(name, "size")] = pool.size()
+        states[(name, "checked_out")] = pool.checkedout()
+        states[(name, "overflow")] = pool.overflow()
+        states[(name, "idle")] = pool.checkedin()
+    return states
+
+
+def instrument_engine(engine, name: str = "primary") -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        DB_STATEMENTS.inc()
+        DB_STATEMENT_TIME.observe(elapsed)
+        current = _request_db.get()
+        if current is not None:
+            current[0] += 1
+            current[1] += elapsed
+
+    if hasattr(engine.pool, "checkedout"):
+        _pools[name] = engine
+
+
+def add_collector(name: str, help: str, labels: tuple, read: Callable[[], dict], kind: str = "gauge") -> None:
+    register(Collector(name, help, labels, read, kind))
+
+
+def observe_upload(category: str, size: int, seconds: float) -> None:
+    UPLOAD_BYTES.inc(category, amount=size)
+    UPLOAD_SIZE.observe(size, category)
+    UPLOAD_DURATION.observe(seconds, category)
+
+
+class MetricsMiddleware:
+    # Plain ASGI middleware: one contextvar set and a few dict updates per request.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        db = [0, 0.0]
+        token = _request_db.set(db)
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - t0
+            _request_db.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            REQUESTS.inc(path, method, status[0])
+            REQUEST_LATENCY.observe(elapsed, path, method)
+            DB_QUERIES.observe(db[0], path)
+            DB_TIME.observe(db[1], path)
@@ -0,0 +1,231 @@
+import argparse
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, insert, inspect, select, text
+
+from . import cache, models, search, stats
+from .config import TICKET_ARCHIVE_STATUSES
+from .db import Base, engine, replica_engines
+
+log = logging.getLogger(__name__)
+
+# Applied versions live in schema_version. A boot with a current schema costs
+# one has_table check and one SELECT MAX(version).
+#
+# Version 1 builds the current models on an empty database, so later steps
+# must be idempotent: inspect first, then ALTER/CREATE only what is missing.
+
+_meta = MetaData()
+schema_version = Table(
+    "schema_version", _meta,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def _create_tables(conn, *models_):
+    Base.metadata.create_all(conn, tables=[m.__table__ for m in models_] or None)
+
+
+def _index_names(conn, insp, table: str) -> set[str]:
+    # Reflection skips SQLite's expression indexes; the catalog lists them all.
+    if conn.dialect.name == "sqlite":
+        return set(conn.scalars(text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :t AND sql IS NOT NULL"), {"t": table}))
+    return {ix["name"] for ix in insp.get_indexes(table)}
+
+
+def _ensure_indexes(conn, *models_, only=None):
+    insp = inspect(conn)
+    for model in models_:
+        table = model.__table__
+        existing = _index_names(conn, insp, table.name)
+        for index in table.indexes:
+            if only is not None and index.name not in only:
+                continue
+            ddl_if = index._ddl_if
+            if index.name in existing or (ddl_if is not None and ddl_if.dialect not in (None, conn.dialect.name)):
+                continue
+            log.info("creating index %s on %s", index.name, table.name)
+            index.create(conn)
+
+
+# Keys shared through content_versions (see broadcast.py): only those another
+# worker caches. Ticket writes have no cross-worker consumer and publish nothing.
+CONTENT_KEYS = cache.PUBLIC_KEYS
+
+
+def _seed_content_versions(conn):
+    _create_tables(conn, models.ContentVersion, models.RevokedToken)
+    present = set(conn.scalars(select(models.ContentVersion.key)))
+    missing = [{"key": k, "version": 0} for k in CONTENT_KEYS if k not in present]
+    if missing:
+        conn.execute(insert(models.ContentVersion), missing)
+
+
+def _add_column(conn, model, name):
+    if name in {c["name"] for c in inspect(conn).get_columns(model.__tablename__)}:
+        return
+    column = model.__table__.c[name]
+    conn.execute(text(f"ALTER TABLE {model.__tablename__} ADD COLUMN {name} {column.type.compile(conn.dialect)} NULL"))
+
+
+def _ticket_archive(conn):
+    _add_column(conn, models.Ticket, "closed_at")
+    # Closed before closed_at existed: created_at is the only lower bound we have.
+    conn.execute(
+        models.Ticket.__table__.update()
+        .where(models.Ticket.status.in_(TICKET_ARCHIVE_STATUSES), models.Ticket.closed_at.is_(None))
+        .values(closed_at=models.Ticket.created_at)
+    )
+    _create_tables(conn, models.TicketArchive)
+    _ensure_indexes(conn, models.Ticket, only={"ix_tickets_status_closed_at"})
+
+
+def _ticket_receipts(conn):
+    _add_column(conn, models.Ticket, "receipt")
+    _ensure_indexes(conn, models.Ticket, only={"ux_tickets_receipt"})
+
+
+def _sqlite_fts(conn):
+    if conn.dialect.name != "sqlite":
+        return
+    for scope in search.SCOPES.values():
+        for model in scope.tables():
+            for statement in search.fts_ddl(scope, model):
+                conn.execute(text(statement))
+
+
+def _ticket_ids(conn):
+    # Without AUTOINCREMENT SQLite reuses max(id) + 1, i.e. the ids of tickets just
+    # moved to the archive. MySQL 8 keeps its counter across restarts.
+    if conn.dialect.name != "sqlite":
+        return
+    ddl = conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'tickets'")).scalar()
+    if "AUTOINCREMENT" not in ddl.upper():
+        for name in _index_names(conn, inspect(conn), "tickets"):
+            conn.execute(text(f"DROP INDEX {name}"))
+        conn.execute(text("ALTER TABLE tickets RENAME TO tickets_rebuild"))
+        models.Ticket.__table__.create(conn)
+        # The model may have columns added by later migrations.
+        cols = ", ".join(c["name"] for c in inspect(conn).get_columns("tickets_rebuild"))
+        conn.execute(text(f"INSERT INTO tickets ({cols}) SELECT {cols} FROM tickets_rebuild"))
+        conn.execute(text("DROP TABLE tickets_rebuild"))
+    top = conn.execute(text(
+        "SELECT MAX(id) FROM (SELECT MAX(id) AS id FROM tickets UNION ALL SELECT MAX(id) FROM tickets_archive "
+        "UNION ALL SELECT seq FROM sqlite_sequence WHERE name = 'tickets')")).scalar() or 0
+    conn.execute(text("DELETE FROM sqlite_sequence WHERE name = 'tickets'"))
+    conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('tickets', :top)"), {"top": top})
+
+
+MIGRATIONS = [
+    (1, "initial schema", lambda conn: _create_tables(conn)),
+    (2, "ticket keyset and fulltext search indexes",
+     lambda conn: _ensure_indexes(conn, models.Ticket, models.Service, models.Resource, only={
+         "ix_tickets_created_at_id", "ix_tickets_status_created_at_id",
+         "ft_tickets_text", "ft_services_text", "ft_resources_text",
+     })),
+    (3, "content_versions and revoked_tokens for multi-worker sync", _seed_content_versions),
+    # tickets_archive is created here too: stats.rebuild() reads it (see 5).
+    (4, "ticket_stats summary",
+     lambda conn: (_create_tables(conn, models.TicketStat, models.TicketArchive), stats.rebuild(conn))),
+    (5, "tickets.closed_at and tickets_archive", _ticket_archive),
+    (6, "tickets_archive list/search indexes; archived ticket ids are never reused",
+     lambda conn: (_ensure_indexes(conn, models.TicketArchive), _ticket_ids(conn))),
+    (7, "tickets.receipt, unique, for idempotent spool flushes", _ticket_receipts),
+    (8, "SQLite FTS5 search tables, kept in sync by triggers", _sqlite_fts),
+    (9, "SQLite keyset indexes on ticket_time(created_at)",
+     lambda conn: _ensure_indexes(conn, models.Ticket, models.TicketArchive, only={
+         "ix_tickets_time_id", "ix_tickets_status_time_id",
+         "ix_tickets_archive_time_id", "ix_tickets_archive_status_time_id",
+     })),
+]
+LATEST = MIGRATIONS[-1][0]
+
+
+def current_version(conn) -> int:
+    schema_version.create(conn, checkfirst=True)
+    return conn.execute(select(func.coalesce(func.max(schema_version.c.version), 0))).scalar_one()
+
+
+def _lock(conn):
+    # Several workers/replicas may boot at once; MySQL serializes them here.
+    if conn.dialect.name == "mysql":
+        if not conn.execute(text("SELECT GET_LOCK('it_service_migrate', 300)")).scalar():
+            raise RuntimeError("timed out waiting for the migration lock")
+
+
+def _unlock(conn):
+    if conn.dialect.name == "mysql":
+        conn.execute(text("SELECT RELEASE_LOCK('it_service_migrate')"))
+
+
+def migrate(bind=engine) -> int:
+    with bind.connect() as conn:
+        version = current_version(conn)
+        conn.commit()
+        if version >= LATEST:
+            return version
+        _lock(conn)
+        try:
+            version = current_version(conn)
+            for number, name, step in MIGRATIONS:
+                if number <= version:
+                    continue
+                log.info("applying migration %d: %s", number, name)
+                step(conn)
+                conn.execute(schema_version.insert().values(
+                    version=number, name=name, applied_at=datetime.now(timezone.utc)))
+                conn.commit()
+                version = number
+        finally:
+            _unlock(conn)
+    return version
+
+
+# Set once the schema is current; /api/ready reports 503 until then.
+schema_ready = threading.Event()
+
+
+def migrate_all() -> int:
+    # Real replicas get the schema through replication. SQLite "replicas" (the
+    # local two-file setup) are independent files, so they are migrated too.
+    version = migrate()
+    for replica in replica_engines:
+        if replica.dialect.name == "sqlite":
+            migrate(replica)
+    return version
+
+
+def migrate_in_background(retry_max: float = 30) -> threading.Thread:
+    def run():
+        delay = 0.5
+        while True:
+            try:
+                log.info("schema at version %d", migrate_all())
+                schema_ready.set()
+                return
+            except Exception as e:
+                log.warning("migration attempt failed (%s); retrying in %.1fs", e, delay)
+                time.sleep(delay)
+                delay = min(delay * 2, retry_max)
+
+    thread = threading.Thread(target=run, name="migrate", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+    parser.add_argument("--status", action="store_true", help="print the current and latest version only")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.status:
+        with engine.connect() as conn:
+            print(f"current={current_version(conn)} latest={LATEST}")
+            conn.commit()
+    else:
+        print(f"schema at version {migrate_all()}")
@@ -1,6 +1,35 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, func, Numeric
+from sqlalchemy import BigInteger, Column, Date, Integer, String, Text, DateTime, func, Numeric, Index, literal_column
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 from .db import Base
 
+def fulltext(name, *columns):
+    # MySQL-only FULLTEXT index backing /api/search; SQLite uses FTS5 tables (search.fts_ddl).
+    return Index(name, *columns, mysql_prefix="FULLTEXT").ddl_if(dialect="mysql")
+
+def sqlite_time_index(name, *columns):
+    # SQLite-only: the keyset's ticket_time(created_at) expression, indexed as the queries write it.
+    return Index(name, *columns).ddl_if(dialect="sqlite")
+
+class ticket_time(FunctionElement):
+    # A timestamp as the database compares it. SQLite keeps DateTime as text:
+    # CURRENT_TIMESTAMP writes 'YYYY-MM-DD HH:MM:SS' while bound datetimes carry
+    # microseconds, so '<', '=' and ORDER BY on the raw column disagree with the
+    # cursor. There both sides go through one strftime format (to the millisecond;
+    # id breaks ties), with expression indexes to match; everywhere else this is
+    # the bare column and keeps its index.
+    type = DateTime()
+    name = "ticket_time"
+    inherit_cache = True
+
+@compiles(ticket_time)
+def _ticket_time(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+@compiles(ticket_time, "sqlite")
+def _ticket_time_sqlite(element, compiler, **kw):
+    return compiler.process(func.strftime(literal_column("'%Y-%m-%d %H:%M:%f'"), *element.clauses.clauses), **kw)
+
 class Service(Base):
     __tablename__ = "services"
     id = Column(Integer, primary_key=True, index=True)
@@ -10,6 +39,8 @@ class Service(Base):
     price = Column(Numeric(10,2), nullable=False, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (fulltext("ft_services_text", "name", "description"),)
+
 class Ticket(Base):
     __tablename__ = "tickets"
     id = Column(Integer, primary_key=True, index=True)
@@ -19,6 +50,43 @@ class Ticket(Base):
     message = Column(Text, nullable=False)
     status = Column(String(40), nullable=False, default="open")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    closed_at = Column(DateTime(timezone=True), nullable=True)  # set when status enters TICKET_ARCHIVE_STATUSES
+    receipt = Column(String(32), nullable=True)  # spool receipt (TICKET_SPOOL mode); dedupes replayed flushes
+
+    # Back the admin list's keyset pagination: newest first, optionally per status.
+    __table_args__ = (
+        Index("ix_tickets_created_at_id", "created_at", "id"),
+        Index("ix_tickets_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_tickets_status_closed_at", "status", "closed_at"),
+        sqlite_time_index("ix_tickets_time_id", ticket_time(created_at), "id"),
+        sqlite_time_index("ix_tickets_status_time_id", "status", ticket_time(created_at), "id"),
+        Index("ux_tickets_receipt", "receipt", unique=True),
+        fulltext("ft_tickets_text", "subject", "message"),
+        # Archived tickets keep their ids; SQLite must not hand them out again.
+        {"sqlite_autoincrement": True},
+    )
+
+# Tickets moved out of the hot table by archive.py; ids are kept.
+class TicketArchive(Base):
+    __tablename__ = "tickets_archive"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(120), nullable=False)
+    email = Column(String(200), nullable=False)
+    subject = Column(String(200), nullable=False)
+    message = Column(Text, nullable=False)
+    status = Column(String(40), nullable=False)
+    created_at = Column(DateTime(timezone=True))
+    closed_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Same access paths as tickets: the admin list (include_archived) and search.
+    __table_args__ = (
+        Index("ix_tickets_archive_created_at_id", "created_at", "id"),
+        Index("ix_tickets_archive_status_created_at_id", "status", "created_at", "id"),
+        sqlite_time_index("ix_tickets_archive_time_id", ticket_time(created_at), "id"),
+        sqlite_time_index("ix_tickets_archive_status_time_id", "status", ticket_time(created_at), "id"),
+        fulltext("ft_tickets_archive_text", "subject", "message"),
+    )
 
 class About(Base):
     __tablename__ = "about"
@@ -40,9 +108,30 @@ class Resource(Base):
     type = Column(String(50))  # e.g., 'article', 'brochure', 'policy', 'news'
     url = Column(String(255))  # link to file or article
 
+    __table_args__ = (fulltext("ft_resources_text", "title", "description"),)
+
 class Partner(Base):
     __tablename__ = "partners"
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
     logo = Column(String(255))  # URL or file path
-    link = Column(String(255))  # Partner website
\ No newline at end of file
+    link = Column(String(255))  # Partner website
+
+# Ticket counts per (created day, status), kept in step by crud in the same
+# transaction as the ticket write (see stats.py).
+class TicketStat(Base):
+    __tablename__ = "ticket_stats"
+    day = Column(Date, primary_key=True)
+    status = Column(String(40), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+# Shared across workers: bumped after content writes, polled by every process (see broadcast.py).
+class ContentVersion(Base):
+    __tablename__ = "content_versions"
+    key = Column(String(40), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    digest = Column(String(64), primary_key=True)
+    expires_at = Column(BigInteger, nullable=False, index=True)  # unix seconds
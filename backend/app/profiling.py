@@ -0,0 +1,195 @@
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from .auth import verify_token
+from .config import PROFILE_SAMPLE_INTERVAL_MS, PROFILING_ENABLED, SLOW_QUERY_LOG_SIZE, SLOW_QUERY_MS
+
+log = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+TOP_N = 30
+MAX_SQL_CHARS = 2000
+
+# Statements issued by the request being profiled: [{"sql", "params", "ms"}].
+_profiled_queries: ContextVar[Optional[list]] = ContextVar("profiled_queries", default=None)
+
+slow_queries: deque = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+_explain_queue: "queue.Queue[tuple]" = queue.Queue(maxsize=100)
+_explainer: Optional[threading.Thread] = None
+
+# Innermost frames of threads that are parked rather than doing work.
+_IDLE_FUNCS = {"wait", "select", "poll", "_worker", "get", "accept", "_recv", "sleep"}
+
+
+class Sampler(threading.Thread):
+    # Wall-clock stack sampler over every busy thread except itself. It can't tell
+    # which request a worker thread is serving, so profile on a quiet instance.
+    def __init__(self, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        me = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me or frame.f_code.co_name in _IDLE_FUNCS:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_filename.rsplit('/', 2)[-1]}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def report(self) -> dict:
+        own, total = Counter(), Counter()
+        for stack, n in self.stacks.items():
+            own[stack[-1]] += n
+            for frame in set(stack):
+                total[frame] += n
+        return {
+            "interval_ms": self.interval * 1000,
+            "ticks": self.samples,
+            "top_self": own.most_common(TOP_N),
+            "top_cumulative": total.most_common(TOP_N),
+            "top_stacks": [{"stack": ";".join(s), "samples": n} for s, n in self.stacks.most_common(10)],
+        }
+
+
+def _explain_prefix(dialect: str) -> str:
+    return "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+
+
+def _explain_worker():
+    while True:
+        engine, statement, parameters, elapsed_ms = _explain_queue.get()
+        entry = {"sql": statement[:MAX_SQL_CHARS], "ms": round(elapsed_ms, 2), "at": time.time(), "explain": None}
+        try:
+            with engine.connect() as conn:
+                raw = conn.connection.cursor()
+                try:
+                    raw.execute(_explain_prefix(engine.dialect.name) + statement, parameters)
+                    cols = [d[0] for d in raw.description or ()]
+                    entry["explain"] = [dict(zip(cols, map(str, row))) for row in raw.fetchall()]
+                finally:
+                    raw.close()
+        except Exception as e:
+            entry["explain"] = f"EXPLAIN failed: {e}"
+        slow_queries.append(entry)
+        log.warning("slow query (%.1f ms): %s | plan=%s", elapsed_ms, entry["sql"], entry["explain"])
+
+
+def instrument_engine(engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["profile_start"].pop()) * 1000
+        queries = _profiled_queries.get()
+        if queries is not None:
+            queries.append({"sql": statement[:MAX_SQL_CHARS], "params": repr(parameters)[:500], "ms": round(elapsed_ms, 3)})
+        # EXPLAIN runs later on its own connection; the current cursor may still be streaming.
+        if SLOW_QUERY_MS and elapsed_ms >= SLOW_QUERY_MS and not executemany:
+            if statement.lstrip()[:6].upper() in ("SELECT", "UPDATE", "DELETE"):
+                try:
+                    _explain_queue.put_nowait((engine, statement, parameters, elapsed_ms))
+                except queue.Full:
+                    pass
+
+    global _explainer
+    if SLOW_QUERY_MS and _explainer is None:
+        _explainer = threading.Thread(target=_explain_worker, name="slow-query-explain", daemon=True)
+        _explainer.start()
+
+
+def _is_admin(headers: dict) -> bool:
+    try:
+        verify_token(headers.get("authorization"), _cookie(headers.get("cookie", ""), "token"))
+        return True
+    except Exception:
+        return False
+
+
+def _cookie(header: str, name: str) -> Optional[str]:
+    for part in header.split(";"):
+        key, _, value = part.strip().partition("=")
+        if key == name:
+            return value
+    return None
+
+
+class ProfilingMiddleware:
+    # Requests carrying "X-Profile: 1" from an admin get their normal response
+    # wrapped as {"status", "response", "queries", "profile"}.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not PROFILING_ENABLED:
+            return await self.app(scope, receive, send)
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        if headers.get(PROFILE_HEADER) not in ("1", "true") or not _is_admin(headers):
+            return await self.app(scope, receive, send)
+
+        start, body = {}, []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+
+        queries: list = []
+        token = _profiled_queries.set(queries)
+        sampler = Sampler(PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        sampler.start()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            elapsed = time.perf_counter() - t0
+            sampler.stop()
+            _profiled_queries.reset(token)
+
+        raw = b"".join(body)
+        resp_headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in start.get("headers", [])}
+        if resp_headers.get("content-encoding"):
+            response = f"<{resp_headers['content-encoding']}-encoded, {len(raw)} bytes>"
+        else:
+            try:
+                response = json.loads(raw) if raw else None
+            except ValueError:
+                response = raw.decode("utf-8", "replace")[:10000]
+        payload = json.dumps({
+            "status": start.get("status"),
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "response": response,
+            "queries": queries,
+            "query_ms": round(sum(q["ms"] for q in queries), 3),
+            "profile": sampler.report(),
+        }, default=str).encode()
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(payload)).encode()),
+            (b"cache-control", b"no-store"),
+        ]})
+        await send({"type": "http.response.body", "body": payload})
@@ -0,0 +1,117 @@
+import ipaddress
+import math
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from .config import (
+    ADMISSION_MAX_CONCURRENT,
+    RATE_LIMIT_LOGIN_BURST,
+    RATE_LIMIT_LOGIN_PER_MIN,
+    RATE_LIMIT_TICKETS_BURST,
+    RATE_LIMIT_TICKETS_PER_MIN,
+    TRUST_PROXY_HEADERS,
+    TRUSTED_PROXIES,
+)
+
+MAX_TRACKED_CLIENTS = 10000
+_PROXY_NETS = [ipaddress.ip_network(c, strict=False) for c in TRUSTED_PROXIES]
+
+
+class TokenBucketLimiter:
+    def __init__(self, name: str, per_minute: float, burst: int):
+        self.name = name
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self.rejected = 0
+
+    # Returns 0 when admitted, otherwise seconds until a token is available.
+    def acquire(self, key: str, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        tokens, last = self.buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens >= 1:
+            wait = 0.0
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate if self.rate > 0 else 60.0
+            self.rejected += 1
+        self.buckets[key] = (tokens, now)
+        if len(self.buckets) > MAX_TRACKED_CLIENTS:
+            self.buckets.popitem(last=False)
+        return wait
+
+
+# Unauthenticated write endpoints: (method, path) -> limiter.
+LIMITERS = {
+    ("POST", "/api/tickets"): TokenBucketLimiter("tickets", RATE_LIMIT_TICKETS_PER_MIN, RATE_LIMIT_TICKETS_BURST),
+    ("POST", "/api/auth/login"): TokenBucketLimiter("login", RATE_LIMIT_LOGIN_PER_MIN, RATE_LIMIT_LOGIN_BURST),
+}
+
+
+class ConcurrencyGate:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.rejected = 0
+
+
+gate = ConcurrencyGate(ADMISSION_MAX_CONCURRENT)
+
+
+def _from_proxy(peer: Optional[str]) -> bool:
+    try:
+        addr = ipaddress.ip_address(peer)
+    except ValueError:
+        return False
+    return any(addr in net for net in _PROXY_NETS)
+
+
+def client_ip(request: Request) -> str:
+    peer = request.client.host if request.client else None
+    if TRUST_PROXY_HEADERS and _from_proxy(peer):
+        real_ip = request.headers.get("x-real-ip")
+        if real_ip:
+            return real_ip.strip()
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            # nginx appends the peer it saw; anything left of that is client-supplied.
+            return forwarded.rsplit(",", 1)[-1].strip()
+    return peer or "unknown"
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail}, status_code=status_code, headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
+async def admission_middleware(request: Request, call_next):
+    limiter = LIMITERS.get((request.method, request.url.path))
+    if limiter is None:
+        return await call_next(request)
+    wait = limiter.acquire(client_ip(request))
+    if wait:
+        return _reject(429, "Too many requests", wait)
+    # Shed instead of queueing so these endpoints can't hog the DB pool and threadpool.
+    if gate.in_flight >= gate.limit:
+        gate.rejected += 1
+        return _reject(503, "Server busy", 1)
+    gate.in_flight += 1
+    try:
+        return await call_next(request)
+    finally:
+        gate.in_flight -= 1
+
+
+def stats() -> dict:
+    return {
+        "rate_limited": {limiter.name: limiter.rejected for limiter in LIMITERS.values()},
+        "shed": gate.rejected,
+        "in_flight": gate.in_flight,
+        "max_concurrent": gate.limit,
+    }
@@ -0,0 +1,110 @@
+from typing import Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import cache, models
+
+# Single-statement writes for the content tables, shared by crud and (through
+# AsyncSession.run_sync) crud_async.
+#
+# Writes go straight to the table and hand back plain rows instead of ORM
+# objects, so nothing is expired on commit and no refresh SELECT follows.
+# Where the dialect has RETURNING (SQLite, MariaDB, Postgres) a create, update
+# or delete is one statement; MySQL reads the row back by id after the write.
+# Conflicts come from the unique constraints themselves (IntegrityError ->
+# ConflictError, which the app maps to 400) rather than a SELECT beforehand,
+# which also closes the check-then-write race.
+
+
+class ConflictError(Exception):
+    pass
+
+
+class Repository:
+    def __init__(self, model, cache_key: Optional[str] = None, conflict_detail: Optional[str] = None):
+        self.model = model
+        self.table = model.__table__
+        self.cache_key = cache_key
+        self.conflict_detail = conflict_detail or f"{model.__name__} conflicts with an existing row"
+
+    def _returning(self, db: Session, kind: str) -> bool:
+        return getattr(db.get_bind().dialect, f"{kind}_returning", False)
+
+    def _row(self, db: Session, *where) -> Optional[Row]:
+        return db.execute(select(*self.table.c).where(*where).limit(1)).first()
+
+    def _write(self, db: Session, fn):
+        try:
+            return fn()
+        except IntegrityError:
+            db.rollback()
+            raise ConflictError(self.conflict_detail)
+
+    def commit(self, db: Session) -> None:
+        db.commit()
+        if self.cache_key:
+            cache.invalidate(self.cache_key)
+
+    def get(self, db: Session, obj_id: int) -> Optional[Row]:
+        return self._row(db, self.table.c.id == obj_id)
+
+    def create(self, db: Session, values: dict, commit: bool = True) -> Row:
+        def run():
+            stmt = insert(self.table).values(**values)
+            if self._returning(db, "insert"):
+                return db.execute(stmt.returning(*self.table.c)).one()
+            return self.get(db, db.execute(stmt).inserted_primary_key[0])
+
+        row = self._write(db, run)
+        if commit:
+            self.commit(db)
+        return row
+
+    def update_where(self, db: Session, values: dict, *where, commit: bool = True) -> Optional[Row]:
+        # `where` must not depend on the columns being written: MySQL re-selects with it.
+        if not values:
+            return self._row(db, *where)
+
+        def run():
+            stmt = update(self.table).where(*where).values(**values)
+            if self._returning(db, "update"):
+                return db.execute(stmt.returning(*self.table.c)).first()
+            db.execute(stmt)
+            return self._row(db, *where)
+
+        row = self._write(db, run)
+        if commit and row is not None:
+            self.commit(db)
+        return row
+
+    def update(self, db: Session, obj_id: int, values: dict, commit: bool = True) -> Optional[Row]:
+        return self.update_where(db, values, self.table.c.id == obj_id, commit=commit)
+
+    def delete(self, db: Session, obj_id: int, commit: bool = True, fetch: bool = False):
+        # The deleted row where RETURNING exists (or, with fetch=True, from a locking
+        # read first); otherwise True. None if there was no such row.
+        where = self.table.c.id == obj_id
+        stmt = delete(self.table).where(where)
+        if self._returning(db, "delete"):
+            result = db.execute(stmt.returning(*self.table.c)).first()
+        elif fetch:
+            result = db.execute(select(*self.table.c).where(where).with_for_update()).first()
+            if result is not None:
+                db.execute(stmt)
+        else:
+            result = db.execute(stmt).rowcount > 0 or None
+        if commit and result is not None:
+            self.commit(db)
+        return result
+
+
+SERVICES = Repository(models.Service, cache.SERVICES, "Service name or slug already exists")
+TICKETS = Repository(models.Ticket)
+TICKET_ARCHIVE = Repository(models.TicketArchive)
+ABOUT = Repository(models.About, cache.ABOUT)
+LEADERS = Repository(models.Leader, cache.LEADERS)
+RESOURCES = Repository(models.Resource, cache.RESOURCES)
+PARTNERS = Repository(models.Partner, cache.PARTNERS)
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, computed_field, model_validator
 from typing import Optional
+from . import images
 
 class ServiceBase(BaseModel):
     name: str = Field(..., min_length=2, max_length=120)
@@ -10,6 +11,14 @@ class ServiceBase(BaseModel):
 class ServiceCreate(ServiceBase):
     pass
 
+# PATCH bodies: only the fields sent are written. Non-nullable fields default to
+# None without allowing an explicit null.
+class ServiceUpdate(BaseModel):
+    name: str = Field(None, min_length=2, max_length=120)
+    slug: str = Field(None, min_length=2, max_length=140)
+    description: str = Field(None, min_length=10)
+    price: float = None
+
 class ServiceOut(ServiceBase):
     id: int
     class Config:
@@ -31,6 +40,43 @@ class TicketOut(BaseModel):
     class Config:
         from_attributes = True
 
+class TicketReceipt(BaseModel):
+    receipt: str
+    status: str = "queued"
+
+class TicketFilter(BaseModel):
+    ids: Optional[list[int]] = Field(None, max_length=10000)
+    status: Optional[str] = None
+    older_than_days: Optional[int] = Field(None, ge=0)
+
+    @model_validator(mode="after")
+    def require_criteria(self):
+        if self.ids is None and self.status is None and self.older_than_days is None:
+            raise ValueError("Provide ids, status or older_than_days")
+        return self
+
+class TicketBulkUpdate(BaseModel):
+    match: TicketFilter
+    status: str = Field(..., min_length=1, max_length=40)
+
+class BulkResult(BaseModel):
+    affected: int
+
+class ImportCounts(BaseModel):
+    inserted: int
+    updated: int
+
+class TicketStatsBucket(BaseModel):
+    period: str  # YYYY-MM-DD or ISO week YYYY-Www
+    total: int
+    by_status: dict[str, int]
+
+class TicketStats(BaseModel):
+    total: int
+    by_status: dict[str, int]
+    by_day: list[TicketStatsBucket]
+    by_week: list[TicketStatsBucket]
+
 # --- New Schemas Below ---
 
 class AboutBase(BaseModel):
@@ -52,11 +98,26 @@ class LeaderBase(BaseModel):
 class LeaderCreate(LeaderBase):
     pass
 
+class LeaderUpdate(BaseModel):
+    name: str = None
+    photo: Optional[str] = None
+    bio: Optional[str] = None
+
+class ImageVariant(BaseModel):
+    url: str
+    width: int
+    type: str
+
 class LeaderOut(LeaderBase):
     id: int
     class Config:
         from_attributes = True
 
+    @computed_field
+    @property
+    def photo_variants(self) -> list[ImageVariant]:
+        return [ImageVariant(**v) for v in images.variants_for(self.photo)]
+
 class ResourceBase(BaseModel):
     title: str
     description: Optional[str]
@@ -66,6 +127,12 @@ class ResourceBase(BaseModel):
 class ResourceCreate(ResourceBase):
     pass
 
+class ResourceUpdate(BaseModel):
+    title: str = None
+    description: Optional[str] = None
+    type: str = None
+    url: str = None
+
 class ResourceOut(ResourceBase):
     id: int
     class Config:
@@ -79,7 +146,35 @@ class PartnerBase(BaseModel):
 class PartnerCreate(PartnerBase):
     pass
 
+class PartnerUpdate(BaseModel):
+    name: str = None
+    logo: Optional[str] = None
+    link: Optional[str] = None
+
 class PartnerOut(PartnerBase):
     id: int
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+    @computed_field
+    @property
+    def logo_variants(self) -> list[ImageVariant]:
+        return [ImageVariant(**v) for v in images.variants_for(self.logo)]
+
+class SiteOut(BaseModel):
+    services: list[ServiceOut]
+    about: Optional[AboutOut]
+    leaders: list[LeaderOut]
+    resources: list[ResourceOut]
+    partners: list[PartnerOut]
+
+class SearchHit(BaseModel):
+    id: int
+    title: str
+    excerpt: str
+    score: float
+
+class SearchResults(BaseModel):
+    scope: str
+    items: list[SearchHit]
+    next_offset: Optional[int] = None
@@ -0,0 +1,104 @@
+import re
+from typing import NamedTuple, Optional
+
+from sqlalchemy import case, column, func, literal, literal_column, or_, select, table, union_all
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+
+from . import models
+
+EXCERPT_CHARS = 200
+_TOKEN_RE = re.compile(r"\w{2,}", re.UNICODE)
+
+
+class Scope(NamedTuple):
+    model: type
+    title: object
+    body: object
+    admin_only: bool
+    archive: Optional[type] = None  # searched too; same column names, disjoint ids
+
+    def tables(self) -> tuple:
+        return (self.model,) if self.archive is None else (self.model, self.archive)
+
+
+SCOPES = {
+    "services": Scope(models.Service, models.Service.name, models.Service.description, False),
+    "resources": Scope(models.Resource, models.Resource.title, models.Resource.description, False),
+    "tickets": Scope(models.Ticket, models.Ticket.subject, models.Ticket.message, True, models.TicketArchive),
+}
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def _hit(row_id, title, body, score) -> dict:
+    return {"id": row_id, "title": title, "excerpt": (body or "")[:EXCERPT_CHARS], "score": round(float(score), 4)}
+
+
+# SQLite counterpart of the MySQL FULLTEXT indexes: an external-content FTS5
+# table per searched table. Triggers keep it in step with every write, in the
+# same transaction, so there is no per-process index to rebuild or sync.
+def fts_table(model) -> str:
+    return f"{model.__tablename__}_fts"
+
+
+def fts_ddl(scope: Scope, model) -> list[str]:
+    table, fts = model.__tablename__, fts_table(model)
+    title, body = scope.title.key, scope.body.key
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({title}, {body}, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts} (rowid, {title}, {body}) VALUES (new.id, new.{title}, new.{body}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts} ({fts}, rowid, {title}, {body}) VALUES ('delete', old.id, old.{title}, old.{body}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {title}, {body} ON {table} BEGIN "
+        f"INSERT INTO {fts} ({fts}, rowid, {title}, {body}) VALUES ('delete', old.id, old.{title}, old.{body}); "
+        f"INSERT INTO {fts} (rowid, {title}, {body}) VALUES (new.id, new.{title}, new.{body}); END",
+        f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')",
+    ]
+
+
+def _mysql(scope: Scope, model, q: str):
+    title, body = getattr(model, scope.title.key), getattr(model, scope.body.key)
+    score = match(title, body, against=q).in_natural_language_mode()
+    return select(model.id, title, func.left(body, EXCERPT_CHARS), score.label("score")).where(score > 0)
+
+
+def _sqlite(scope: Scope, model, terms: list[str]):
+    fts = fts_table(model)
+    t = table(fts, column("rowid"), column(scope.title.key), column(scope.body.key))
+    # Quoted terms joined with OR: any word matches, like natural language mode.
+    query = " OR ".join(f'"{term}"' for term in terms)
+    return (
+        select(t.c.rowid.label("id"), t.c[scope.title.key], func.substr(t.c[scope.body.key], 1, EXCERPT_CHARS),
+               (-func.bm25(literal_column(fts))).label("score"))
+        .where(literal_column(fts).op("MATCH")(query))
+    )
+
+
+def _scan(scope: Scope, model, terms: list[str]):
+    # Other dialects: no index, the score is the number of distinct terms present.
+    title, body = getattr(model, scope.title.key), getattr(model, scope.body.key)
+    hits = [or_(func.lower(title).contains(t, autoescape=True), func.lower(body).contains(t, autoescape=True))
+            for t in terms]
+    score = sum((case((hit, 1), else_=0) for hit in hits), literal(0))
+    return select(model.id, title, func.substr(body, 1, EXCERPT_CHARS), score.label("score")).where(or_(*hits))
+
+
+# Returns up to limit + 1 ranked hits so callers can tell whether another page exists.
+def search(db: Session, scope_name: str, q: str, limit: int = 20, offset: int = 0) -> list[dict]:
+    scope = SCOPES[scope_name]
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        ranked = [_mysql(scope, model, q) for model in scope.tables()]
+    else:
+        terms = sorted(set(tokenize(q)))
+        if not terms:
+            return []
+        build = _sqlite if dialect == "sqlite" else _scan
+        ranked = [build(scope, model, terms) for model in scope.tables()]
+    hits = union_all(*ranked).subquery() if len(ranked) > 1 else ranked[0].subquery()
+    stmt = select(*hits.c).order_by(hits.c.score.desc(), hits.c.id.desc()).limit(limit + 1).offset(offset)
+    return [_hit(*row) for row in db.execute(stmt)]
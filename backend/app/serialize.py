@@ -0,0 +1,36 @@
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+
+# Opt-in (FAST_JSON=1) list serialization: select only the columns the schema
+# exposes and let a precompiled TypeAdapter validate and encode the rows in one
+# pass, skipping ORM hydration and jsonable_encoder.
+
+
+class ColumnSerializer:
+    def __init__(self, model, schema: type[BaseModel], order_by=None):
+        self.columns = [getattr(model, name) for name in schema.model_fields]
+        self.order_by = order_by
+        self.adapter = TypeAdapter(list[schema])
+
+    def select(self):
+        stmt = select(*self.columns)
+        return stmt.order_by(*self.order_by) if self.order_by is not None else stmt
+
+    def dump(self, rows) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(rows, from_attributes=True))
+
+    def fetch(self, db: Session) -> bytes:
+        return self.dump(db.execute(self.select()).all())
+
+
+SERVICES = ColumnSerializer(models.Service, schemas.ServiceOut, (models.Service.created_at.desc(),))
+LEADERS = ColumnSerializer(models.Leader, schemas.LeaderOut)
+RESOURCES = ColumnSerializer(models.Resource, schemas.ResourceOut)
+PARTNERS = ColumnSerializer(models.Partner, schemas.PartnerOut)
+TICKETS = ColumnSerializer(models.Ticket, schemas.TicketOut)
+# Cursor encoding needs created_at even though TicketOut doesn't expose it.
+TICKET_COLUMNS = TICKETS.columns + [models.Ticket.created_at]
+
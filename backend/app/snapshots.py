@@ -0,0 +1,139 @@
+import argparse
+import gzip
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Callable
+
+from fastapi import HTTPException
+
+from . import cache, migrations
+from .config import STATIC_PUBLISH_DIR
+
+log = logging.getLogger(__name__)
+
+# Static JSON snapshots of the public endpoints for nginx (STATIC_PUBLISH_DIR).
+#
+# For each key we write <key>.json and <key>.json.gz (for gzip_static) through
+# a temp file + rename, so nginx never serves a partial file, then record the
+# body's ETag and publish time in index.json. Whichever worker commits a write
+# republishes the affected keys from its primary-backed loaders; a key whose
+# loader 404s (no About row yet) has its files removed, so nginx falls back to
+# the API. `python -m app.snapshots` rebuilds every file.
+
+SNAPSHOT_KEYS = cache.PUBLIC_KEYS + (cache.SITE,)
+
+_cond = threading.Condition()
+_pending: set[str] = set()
+_loaders: dict[str, Callable[[], object]] = {}
+_thread = None
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _update_index(updates: dict) -> None:
+    path = os.path.join(STATIC_PUBLISH_DIR, "index.json")
+    try:
+        with open(path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+    for key, meta in updates.items():
+        if meta is None:
+            index.pop(key, None)
+        else:
+            index[key] = meta
+    _write_atomic(path, json.dumps(index, indent=1, sort_keys=True).encode())
+
+
+def publish(*keys: str) -> None:
+    os.makedirs(STATIC_PUBLISH_DIR, exist_ok=True)
+    updates = {}
+    for key in keys:
+        path = os.path.join(STATIC_PUBLISH_DIR, f"{key}.json")
+        try:
+            entry = cache.content_cache.get(key, _loaders[key])
+        except HTTPException as e:
+            if e.status_code != 404:
+                raise
+            _remove(path + ".gz")
+            _remove(path)
+            updates[key] = None
+            continue
+        # .gz first: a client briefly getting the newer body compressed is harmless.
+        _write_atomic(path + ".gz", entry.gzip_body or gzip.compress(entry.body, compresslevel=9))
+        _write_atomic(path, entry.body)
+        updates[key] = {"etag": entry.etag, "bytes": len(entry.body), "published_at": int(time.time())}
+    _update_index(updates)
+
+
+def schedule(*keys: str) -> None:
+    keys = [k for k in keys if k in cache.PUBLIC_KEYS]
+    if not keys:
+        return
+    with _cond:
+        _pending.update(keys)
+        _pending.add(cache.SITE)
+        _cond.notify()
+
+
+def _run() -> None:
+    while not migrations.schema_ready.wait(0.5):
+        pass
+    while True:
+        with _cond:
+            _cond.wait_for(lambda: _pending)
+            keys = sorted(_pending)
+            _pending.clear()
+        try:
+            publish(*keys)
+        except Exception as e:
+            log.warning("static snapshot publish failed (%s); retrying", e)
+            with _cond:
+                _pending.update(keys)
+            time.sleep(1)
+
+
+def start(loaders: dict[str, Callable[[], object]]) -> None:
+    global _thread
+    _loaders.update(loaders)
+    if not STATIC_PUBLISH_DIR or _thread is not None:
+        return
+    if schedule not in cache.listeners:
+        cache.listeners.append(schedule)
+    # Boot publishes everything, so a fresh volume or missed write is repaired.
+    schedule(*cache.PUBLIC_KEYS)
+    _thread = threading.Thread(target=_run, name="static-snapshots", daemon=True)
+    _thread.start()
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description="Rebuild every static JSON snapshot in STATIC_PUBLISH_DIR.").parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if not STATIC_PUBLISH_DIR:
+        raise SystemExit("STATIC_PUBLISH_DIR is not set")
+    from .main import PUBLIC_LOADERS, _load_site
+
+    _loaders.update(PUBLIC_LOADERS, **{cache.SITE: _load_site})
+    publish(*SNAPSHOT_KEYS)
+    print(f"published {', '.join(SNAPSHOT_KEYS)} to {STATIC_PUBLISH_DIR}")
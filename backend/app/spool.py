@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, select
+
+from . import models, schemas, stats
+from .config import TICKET_SPOOL_BATCH, TICKET_SPOOL_INTERVAL_MS, TICKET_SPOOL_PATH
+from .db import SessionLocal
+
+log = logging.getLogger(__name__)
+
+# Write-behind for public ticket submission (TICKET_SPOOL=1).
+#
+# submit() appends the ticket to a local SQLite WAL file (synchronous=FULL, so
+# it is on disk before we answer) and returns a receipt. A flusher thread
+# moves spooled rows to the main DB in multi-row INSERTs every
+# TICKET_SPOOL_INTERVAL_MS. A flush claims a batch in one short UPDATE, inserts
+# it into the main DB without holding any spool lock, then deletes the claimed
+# rows, so submit() never waits on the main DB. Several workers sharing one
+# spool file claim disjoint batches.
+#
+# Delivery is at-least-once: a claim left by a process that died, or that
+# outlived CLAIM_TIMEOUT_S, is flushed again. tickets.receipt is unique and a
+# flush skips receipts already inserted, so a replay never duplicates a ticket.
+
+CLAIM_TIMEOUT_S = 60
+
+
+class TicketSpool:
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS spool ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, receipt TEXT NOT NULL, payload TEXT NOT NULL, created_at TEXT NOT NULL)"
+        )
+        # Spool files from before claims existed.
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(spool)")}
+        if "claim" not in columns:
+            self._conn.execute("ALTER TABLE spool ADD COLUMN claim TEXT")
+            self._conn.execute("ALTER TABLE spool ADD COLUMN claimed_until REAL")
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def submit(self, data: schemas.TicketCreate) -> str:
+        receipt = uuid.uuid4().hex
+        created_at = datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO spool (receipt, payload, created_at) VALUES (?, ?, ?)",
+                (receipt, data.model_dump_json(), created_at),
+            )
+        return receipt
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+
+    def _claim(self) -> tuple[str, list]:
+        claim, now = uuid.uuid4().hex, time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE spool SET claim = ?, claimed_until = ? WHERE seq IN ("
+                "SELECT seq FROM spool WHERE claim IS NULL OR claimed_until < ? ORDER BY seq LIMIT ?)",
+                (claim, now + CLAIM_TIMEOUT_S, now, TICKET_SPOOL_BATCH),
+            )
+            rows = self._conn.execute(
+                "SELECT receipt, payload, created_at FROM spool WHERE claim = ? ORDER BY seq", (claim,)
+            ).fetchall()
+        return claim, rows
+
+    def _settle(self, claim: str, done: bool) -> None:
+        with self._lock:
+            if done:
+                self._conn.execute("DELETE FROM spool WHERE claim = ?", (claim,))
+            else:
+                self._conn.execute("UPDATE spool SET claim = NULL, claimed_until = NULL WHERE claim = ?", (claim,))
+
+    def flush(self) -> int:
+        claim, rows = self._claim()
+        if not rows:
+            return 0
+        try:
+            with SessionLocal() as db:
+                done = set(db.scalars(
+                    select(models.Ticket.receipt).where(models.Ticket.receipt.in_([r for r, _, _ in rows]))
+                ))
+                tickets = [
+                    dict(json.loads(payload), status="open", receipt=receipt, created_at=datetime.fromisoformat(created_at))
+                    for receipt, payload, created_at in rows
+                    if receipt not in done
+                ]
+                if tickets:
+                    db.execute(insert(models.Ticket), tickets)
+                    stats.tickets_inserted(db, tickets)
+                    db.commit()
+        except BaseException:
+            self._settle(claim, done=False)
+            raise
+        self._settle(claim, done=True)
+        return len(rows)
+
+    def _run(self) -> None:
+        while not self._stop.wait(TICKET_SPOOL_INTERVAL_MS / 1000):
+            try:
+                while self.flush() == TICKET_SPOOL_BATCH:
+                    pass
+            except Exception:
+                log.exception("ticket spool flush failed; will retry")
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ticket-spool", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        try:
+            while self.flush():
+                pass
+        except Exception:
+            log.exception("final ticket spool flush failed; rows stay spooled")
+
+
+_spool = None
+
+
+def get_spool() -> TicketSpool:
+    global _spool
+    if _spool is None:
+        _spool = TicketSpool(TICKET_SPOOL_PATH)
+    return _spool
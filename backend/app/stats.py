@@ -0,0 +1,148 @@
+import argparse
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy import delete, func, insert, select, union_all, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from . import models
+
+# Ticket counts per (created day, status) in ticket_stats. Every ticket write in
+# crud/crud_async/spool applies its deltas in the same transaction, so the
+# summary commits or rolls back with the tickets it describes and
+# /api/tickets/stats reads a table sized by days x statuses, not by tickets.
+# `python -m app.stats` rebuilds it from the tickets table if it ever drifts.
+
+T = models.Ticket
+S = models.TicketStat
+
+
+def _day(value) -> date:
+    # DATE() comes back as a date on MySQL and a string on SQLite.
+    if isinstance(value, datetime):
+        return value.date()
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+def apply(db, deltas: Counter) -> None:
+    rows = [{"day": day, "status": status, "count": n} for (day, status), n in deltas.items() if n]
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = mysql.insert(S)
+        stmt = stmt.on_duplicate_key_update(count=S.count + stmt.inserted["count"])
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(S)
+        stmt = stmt.on_conflict_do_update(index_elements=[S.day, S.status], set_={"count": S.count + stmt.excluded["count"]})
+    else:
+        _update_then_insert(db, rows)
+        return
+    db.execute(stmt, rows)
+
+
+def _update_then_insert(db, rows: list[dict]) -> None:
+    # Other dialects: UPDATE each row, INSERT where nothing matched. If a
+    # concurrent transaction inserts the same (day, status) first, the INSERT
+    # fails on the primary key inside its savepoint and becomes an UPDATE.
+    for row in rows:
+        bump = update(S).where(S.day == row["day"], S.status == row["status"]).values(count=S.count + row["count"])
+        if db.execute(bump).rowcount:
+            continue
+        try:
+            with db.begin_nested():
+                db.execute(insert(S).values(**row))
+        except IntegrityError:
+            db.execute(bump)
+
+
+def counted(db, where: Iterable, lock: bool = False) -> Counter:
+    day = func.date(T.created_at)
+    stmt = select(day, T.status, func.count()).where(*where).group_by(day, T.status)
+    if lock:
+        # MySQL locks the scanned rows, so the bulk write that follows can't touch uncounted ones.
+        stmt = stmt.with_for_update()
+    return Counter({(_day(d), s): n for d, s, n in db.execute(stmt)})
+
+
+def added(db, ticket: models.Ticket) -> None:
+    apply(db, Counter({(_day(ticket.created_at), ticket.status): 1}))
+
+
+def removed(db, ticket: models.Ticket) -> None:
+    apply(db, Counter({(_day(ticket.created_at), ticket.status): -1}))
+
+
+def moved(db, ticket: models.Ticket, old_status: str) -> None:
+    day = _day(ticket.created_at)
+    if old_status != ticket.status:
+        apply(db, Counter({(day, old_status): -1, (day, ticket.status): 1}))
+
+
+def rows_removed(db, where: Iterable) -> Counter:
+    before = counted(db, where, lock=True)
+    apply(db, Counter({k: -n for k, n in before.items()}))
+    return before
+
+
+def status_changed(db, before: Counter, status: str) -> None:
+    after = Counter()
+    for (day, _), n in before.items():
+        after[(day, status)] += n
+    apply(db, after)
+
+
+def tickets_inserted(db, tickets: list[dict]) -> None:
+    apply(db, Counter((_day(t["created_at"]), t["status"]) for t in tickets))
+
+
+def rebuild(db) -> int:
+    # Archived tickets still count; archive.py moves rows without touching the summary.
+    both = union_all(
+        select(T.created_at, T.status),
+        select(models.TicketArchive.created_at, models.TicketArchive.status),
+    ).subquery()
+    day = func.date(both.c.created_at)
+    db.execute(delete(S))
+    rows = db.execute(select(day, both.c.status, func.count()).group_by(day, both.c.status)).all()
+    if rows:
+        db.execute(insert(S), [{"day": _day(d), "status": s, "count": n} for d, s, n in rows])
+    return sum(n for _, _, n in rows)
+
+
+def _buckets(totals: dict) -> list[dict]:
+    return [
+        {"period": period, "total": sum(by_status.values()), "by_status": dict(by_status)}
+        for period, by_status in sorted(totals.items(), reverse=True)
+    ]
+
+
+def read(db, days: int = 30, weeks: int = 12) -> dict:
+    by_status = dict(db.execute(select(S.status, func.sum(S.count)).group_by(S.status).having(func.sum(S.count) > 0)).all())
+    today = datetime.now(timezone.utc).date()
+    since = min(today - timedelta(days=days - 1), today - timedelta(days=today.weekday() + 7 * (weeks - 1)))
+    per_day, per_week = defaultdict(Counter), defaultdict(Counter)
+    for day, status, n in db.execute(select(S.day, S.status, S.count).where(S.day >= since, S.count > 0)):
+        day = _day(day)
+        if day > today - timedelta(days=days):
+            per_day[day.isoformat()][status] += n
+        iso = day.isocalendar()
+        per_week[f"{iso.year}-W{iso.week:02d}"][status] += n
+    return {
+        "total": int(sum(by_status.values())),
+        "by_status": {k: int(v) for k, v in by_status.items()},
+        "by_day": _buckets(per_day),
+        "by_week": _buckets(per_week)[:weeks],
+    }
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description="Rebuild ticket_stats from the tickets table.").parse_args()
+    from .db import SessionLocal
+
+    with SessionLocal() as db:
+        total = rebuild(db)
+        db.commit()
+    print(f"ticket_stats rebuilt over {total} tickets")
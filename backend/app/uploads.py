@@ -0,0 +1,176 @@
+import hashlib
+import os
+import re
+import tempfile
+import time
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+from . import metrics
+from .config import UPLOAD_DIR, UPLOAD_URL_PREFIX, UPLOAD_MAX_BYTES
+
+CATEGORIES = ("leaders", "partners", "services", "aboutus", "resources")
+CHUNK_SIZE = 1024 * 1024
+# Room for the multipart boundaries and part headers around the file itself.
+FORM_OVERHEAD = 64 * 1024
+_EXT_RE = re.compile(r"^\.[a-z0-9]{1,8}$")
+
+
+def _extension(filename: str) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if _EXT_RE.match(ext) else ""
+
+
+class BlobWriter:
+    # Hashes chunks into a temp file in the category dir; finish() renames it to
+    # its sha256 name and returns (stored name, size).
+    def __init__(self, category: str, ext: str):
+        self.target_dir = os.path.join(UPLOAD_DIR, category)
+        os.makedirs(self.target_dir, exist_ok=True)
+        self.ext = ext
+        self.digest = hashlib.sha256()
+        self.size = 0
+        fd, self.tmp_path = tempfile.mkstemp(dir=self.target_dir, prefix=".upload-")
+        self.out = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > UPLOAD_MAX_BYTES:
+            raise HTTPException(status_code=413, detail="File too large")
+        self.digest.update(chunk)
+        self.out.write(chunk)
+
+    def finish(self) -> tuple[str, int]:
+        self.out.close()
+        name = self.digest.hexdigest() + self.ext
+        final_path = os.path.join(self.target_dir, name)
+        if os.path.exists(final_path):
+            os.unlink(self.tmp_path)
+        else:
+            os.replace(self.tmp_path, final_path)
+        return name, self.size
+
+    def abort(self) -> None:
+        self.out.close()
+        if os.path.exists(self.tmp_path):
+            os.unlink(self.tmp_path)
+
+
+class _FormFile:
+    # Callbacks for multipart.MultipartParser: the first part named `field` that
+    # carries a filename goes into a BlobWriter; every other part is discarded.
+    def __init__(self, category: str, field: str):
+        self.category = category
+        self.field = field.encode()
+        self.writer: Optional[BlobWriter] = None
+        self.complete = False
+        self._in_file = False
+        self._headers: dict[bytes, bytes] = {}
+        self._name = self._value = b""
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.part_begin,
+            "on_header_field": self.header_field,
+            "on_header_value": self.header_value,
+            "on_header_end": self.header_end,
+            "on_headers_finished": self.headers_finished,
+            "on_part_data": self.part_data,
+            "on_part_end": self.part_end,
+        }
+
+    def part_begin(self):
+        self._headers, self._in_file = {}, False
+
+    def header_field(self, data: bytes, start: int, end: int):
+        self._name += data[start:end]
+
+    def header_value(self, data: bytes, start: int, end: int):
+        self._value += data[start:end]
+
+    def header_end(self):
+        self._headers[self._name.lower()] = self._value
+        self._name = self._value = b""
+
+    def headers_finished(self):
+        _, params = parse_options_header(self._headers.get(b"content-disposition", b""))
+        filename = params.get(b"filename")
+        if self.writer is None and params.get(b"name") == self.field and filename is not None:
+            self.writer = BlobWriter(self.category, _extension(filename.decode("utf-8", "replace")))
+            self._in_file = True
+
+    def part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self.writer.write(data[start:end])
+
+    def part_end(self):
+        if self._in_file:
+            self.complete, self._in_file = True, False
+
+
+def url_to_path(url: Optional[str]) -> Optional[str]:
+    prefix = UPLOAD_URL_PREFIX + "/"
+    if not url or not url.startswith(prefix):
+        return None
+    rel = url[len(prefix):]
+    if ".." in rel.split("/"):
+        return None
+    return os.path.join(UPLOAD_DIR, rel)
+
+
+async def read_body(request: Request, limit: int, detail: str = "Request body too large") -> bytes:
+    # request.body() with a cap: a declared Content-Length over the limit is
+    # refused unread, and any other body is cut off once it passes the limit.
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > limit:
+        raise HTTPException(status_code=413, detail=detail)
+    chunks, received = [], 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > limit:
+            raise HTTPException(status_code=413, detail=detail)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def save_upload(request: Request, category: str, field: str = "file") -> str:
+    # Parses the multipart body as it arrives: the file is hashed and written
+    # once, nothing is spooled first, and a body of any framing (chunked
+    # included) is cut off with a 413 as soon as it passes the limit. Parsing,
+    # hashing and disk writes run in the threadpool, a CHUNK_SIZE at a time.
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or not params.get(b"boundary"):
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data body")
+    t0 = time.perf_counter()
+    form = _FormFile(category, field)
+    parser = MultipartParser(params[b"boundary"], form.callbacks())
+    received, pending, pending_size = 0, [], 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > UPLOAD_MAX_BYTES + FORM_OVERHEAD:
+                raise HTTPException(status_code=413, detail="File too large")
+            pending.append(chunk)
+            pending_size += len(chunk)
+            if pending_size >= CHUNK_SIZE:
+                await run_in_threadpool(parser.write, b"".join(pending))
+                pending, pending_size = [], 0
+        await run_in_threadpool(parser.write, b"".join(pending))
+        parser.finalize()
+        if not form.complete:
+            raise HTTPException(status_code=400, detail=f"Missing file field '{field}'")
+        name, size = await run_in_threadpool(form.writer.finish)
+    except MultipartParseError:
+        if form.writer:
+            form.writer.abort()
+        raise HTTPException(status_code=400, detail="Malformed multipart body")
+    except BaseException:
+        if form.writer:
+            form.writer.abort()
+        raise
+    metrics.observe_upload(category, size, time.perf_counter() - t0)
+    return f"{UPLOAD_URL_PREFIX}/{category}/{name}"
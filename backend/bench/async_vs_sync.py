@@ -0,0 +1,102 @@
+"""Compare sync (threadpool) and DB_ASYNC route throughput as client concurrency grows.
+
+    pip install -r requirements-dev.txt
+    python bench/async_vs_sync.py --concurrency 1,16,64,256 --requests 2000
+
+Defaults to a throwaway SQLite file (aiosqlite in async mode); pass --database-url
+to point both modes at MySQL for numbers that include real network round trips.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def start_server(port, env):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND, env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/ready").status_code == 200:
+                return proc
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+async def drive(base, path, headers, concurrency, total):
+    latencies = []
+    remaining = iter(range(total))
+
+    async def worker(client):
+        for _ in remaining:
+            t0 = time.perf_counter()
+            r = await client.get(path, headers=headers)
+            r.raise_for_status()
+            latencies.append(time.perf_counter() - t0)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60) as client:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+    return {
+        "concurrency": concurrency,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def run_mode(mode, args, database_url, port):
+    env = dict(os.environ, DATABASE_URL=database_url, DB_ASYNC="1" if mode == "async" else "0")
+    proc = start_server(port, env)
+    try:
+        base = f"http://127.0.0.1:{port}"
+        token = httpx.post(f"{base}/api/auth/login", json={"username": args.admin_user, "password": args.admin_pass}).json()["token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        ticket = {"name": "Bench", "email": "bench@example.com", "subject": "bench", "message": "benchmark ticket"}
+        ticket_id = httpx.post(f"{base}/api/tickets", json=ticket).json()["id"]
+        # Admin ticket lookups are uncached, so every request checks out a DB connection.
+        path = f"/api/tickets/{ticket_id}"
+        return [asyncio.run(drive(base, path, headers, c, args.requests)) for c in args.concurrency]
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--database-url")
+    p.add_argument("--concurrency", type=lambda s: [int(x) for x in s.split(",")], default=[1, 16, 64, 256])
+    p.add_argument("--requests", type=int, default=2000)
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--admin-user", default=os.getenv("ADMIN_USER", "admin"))
+    p.add_argument("--admin-pass", default=os.getenv("ADMIN_PASS", "change-me"))
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{tmp}/bench.db"
+        results = {mode: run_mode(mode, args, database_url, args.port) for mode in ("sync", "async")}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
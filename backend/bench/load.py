@@ -0,0 +1,241 @@
+"""Seeded load run over the public, admin and upload endpoints, checked against a baseline.
+
+    pip install -r requirements-dev.txt
+    python bench/load.py --tickets 1000000 --services 5000 --output run.json
+    python bench/load.py --write-baseline          # refresh bench/baseline.json
+
+Seeds a throwaway SQLite file (or --database-url, e.g. a scratch MySQL schema),
+boots app.main:app under uvicorn, then drives each scenario with --concurrency
+clients. Prints JSON with rps and p50/p95/p99 per scenario; exits 1 when a
+scenario's p95 grows or its rps drops by more than --tolerance against the
+baseline. Compare only runs made on the same machine with the same dataset.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+from async_vs_sync import percentile, start_server
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(BACKEND, "bench", "baseline.json")
+STATUSES = ("open", "in_progress", "closed")
+WORDS = "network printer email vpn laptop password backup server outage license account wifi".split()
+SEED_BATCH = 10_000
+
+
+def _text(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def seed(database_url, args):
+    os.environ["DATABASE_URL"] = database_url
+    sys.path.insert(0, BACKEND)
+    from sqlalchemy import insert
+    from app import migrations, models
+    from app.db import engine
+
+    rng = random.Random(args.seed)
+    # The full schema, FTS5 tables and their triggers included, before the rows go in.
+    migrations.migrate(engine)
+    now = datetime.utcnow()
+
+    def batches(total, make):
+        for start in range(0, total, SEED_BATCH):
+            yield [make(i) for i in range(start, min(total, start + SEED_BATCH))]
+
+    tables = {
+        models.Service: (args.services, lambda i: {
+            "name": f"Service {i}", "slug": f"service-{i}", "description": _text(rng, 40),
+            "price": rng.randint(0, 5000), "created_at": now - timedelta(minutes=i),
+        }),
+        models.Resource: (args.resources, lambda i: {
+            "title": f"Resource {i} {_text(rng, 3)}", "description": _text(rng, 30),
+            "type": rng.choice(("article", "brochure", "policy", "news")), "url": f"https://example.com/r/{i}",
+        }),
+        models.Partner: (args.partners, lambda i: {
+            "name": f"Partner {i}", "logo": f"/src/assets/partners/{i}.png", "link": f"https://partner{i}.example.com",
+        }),
+        models.Leader: (args.leaders, lambda i: {
+            "name": f"Leader {i}", "photo": f"/src/assets/leaders/{i}.jpg", "bio": _text(rng, 25),
+        }),
+        models.Ticket: (args.tickets, lambda i: {
+            "name": f"User {i % 5000}", "email": f"user{i % 5000}@example.com", "subject": _text(rng, 5),
+            "message": _text(rng, 30), "status": rng.choice(STATUSES),
+            "created_at": now - timedelta(seconds=(args.tickets - i) * 30),
+        }),
+    }
+    t0 = time.perf_counter()
+    with engine.begin() as conn:
+        if conn.execute(models.Ticket.__table__.select().limit(1)).first() is None:
+            conn.execute(insert(models.About), [{"content": _text(rng, 200)}])
+            for model, (total, make) in tables.items():
+                for rows in batches(total, make):
+                    conn.execute(insert(model), rows)
+    engine.dispose()
+    return round(time.perf_counter() - t0, 1)
+
+
+def scenarios(args, upload_body):
+    counter = iter(range(10**9))
+    return {
+        "site": ("GET", "/api/site", False, None),
+        "services": ("GET", "/api/services", False, None),
+        "resources": ("GET", "/api/resources", False, None),
+        "partners": ("GET", "/api/partners", False, None),
+        "leaders": ("GET", "/api/leaders", False, None),
+        "about": ("GET", "/api/about", False, None),
+        "search_services": ("GET", "/api/search?scope=services&q=vpn+backup", False, None),
+        "tickets_page": ("GET", "/api/tickets?limit=50", True, None),
+        "tickets_filtered": ("GET", "/api/tickets?limit=50&status=open", True, None),
+        "ticket_by_id": ("GET", lambda: f"/api/tickets/{random.randint(1, max(1, args.tickets))}", True, None),
+        "ticket_submit": ("POST", "/api/tickets", False, lambda: {"json": {
+            "name": "Bench", "email": "bench@example.com", "subject": "bench", "message": "load test ticket",
+        }}),
+        # Distinct prefix per request so content-addressed storage can't dedupe it away.
+        "upload_large": ("POST", "/upload/resources", True, lambda: {"files": {
+            "file": ("bench.bin", b"%d:" % next(counter) + upload_body, "application/octet-stream"),
+        }}),
+    }
+
+
+async def drive(base, method, path, headers, body, concurrency, total):
+    latencies, errors = [], 0
+    remaining = iter(range(total))
+
+    async def worker(client):
+        nonlocal errors
+        for _ in remaining:
+            url = path() if callable(path) else path
+            kwargs = body() if body else {}
+            t0 = time.perf_counter()
+            r = await client.request(method, url, headers=headers, **kwargs)
+            latencies.append(time.perf_counter() - t0)
+            if r.status_code >= 400:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=120) as client:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+    return {
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, cur in results.items():
+        ref = baseline.get("results", {}).get(name)
+        if not ref:
+            continue
+        if cur["p95_ms"] > ref["p95_ms"] * (1 + tolerance):
+            regressions.append({"scenario": name, "metric": "p95_ms", "baseline": ref["p95_ms"], "current": cur["p95_ms"]})
+        if cur["rps"] < ref["rps"] * (1 - tolerance):
+            regressions.append({"scenario": name, "metric": "rps", "baseline": ref["rps"], "current": cur["rps"]})
+        if cur["errors"] > ref.get("errors", 0):
+            regressions.append({"scenario": name, "metric": "errors", "baseline": ref.get("errors", 0), "current": cur["errors"]})
+    return regressions
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--database-url")
+    p.add_argument("--tickets", type=int, default=100_000)
+    p.add_argument("--services", type=int, default=1000)
+    p.add_argument("--resources", type=int, default=1000)
+    p.add_argument("--partners", type=int, default=200)
+    p.add_argument("--leaders", type=int, default=50)
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    p.add_argument("--upload-mb", type=float, default=10)
+    p.add_argument("--upload-requests", type=int, default=40)
+    p.add_argument("--only", type=lambda s: s.split(","), help="comma-separated scenario names")
+    p.add_argument("--port", type=int, default=8766)
+    p.add_argument("--async-db", action="store_true", help="run the server with DB_ASYNC=1")
+    p.add_argument("--baseline", default=BASELINE)
+    p.add_argument("--tolerance", type=float, default=0.2)
+    p.add_argument("--write-baseline", action="store_true")
+    p.add_argument("--output")
+    p.add_argument("--admin-user", default=os.getenv("ADMIN_USER", "admin"))
+    p.add_argument("--admin-pass", default=os.getenv("ADMIN_PASS", "change-me"))
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{tmp}/bench.db"
+        seed_seconds = seed(database_url, args)
+        env = dict(
+            os.environ, DATABASE_URL=database_url, DB_ASYNC="1" if args.async_db else "0",
+            UPLOAD_DIR=os.path.join(tmp, "uploads"), UPLOAD_MAX_BYTES=str(int(args.upload_mb * 2**20) + 2**20),
+            # Measure the handlers, not the admission limits.
+            RATE_LIMIT_TICKETS_PER_MIN="1000000000", RATE_LIMIT_TICKETS_BURST="1000000000",
+            ADMISSION_MAX_CONCURRENT=str(max(args.concurrency, 16)), TRUST_PROXY_HEADERS="0",
+        )
+        proc = start_server(args.port, env)
+        try:
+            base = f"http://127.0.0.1:{args.port}"
+            token = httpx.post(f"{base}/api/auth/login", json={"username": args.admin_user, "password": args.admin_pass}).json()["token"]
+            admin = {"Authorization": f"Bearer {token}"}
+            upload_body = os.urandom(int(args.upload_mb * 2**20))
+            results = {}
+            for name, (method, path, auth, body) in scenarios(args, upload_body).items():
+                if args.only and name not in args.only:
+                    continue
+                total = args.upload_requests if name == "upload_large" else args.requests
+                results[name] = asyncio.run(drive(base, method, path, admin if auth else {}, body, args.concurrency, total))
+                print(f"{name:18} {results[name]}", file=sys.stderr)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    report = {
+        "meta": {
+            "created": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "database": "sqlite" if not args.database_url else args.database_url.split("://")[0],
+            "async_db": args.async_db,
+            "dataset": {k: getattr(args, k) for k in ("tickets", "services", "resources", "partners", "leaders", "seed")},
+            "seed_seconds": seed_seconds,
+            "concurrency": args.concurrency,
+            "upload_mb": args.upload_mb,
+        },
+        "results": results,
+    }
+    if args.write_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["meta"]["dataset"] != report["meta"]["dataset"]:
+            print("warning: baseline was recorded with a different dataset", file=sys.stderr)
+        report["baseline"] = args.baseline
+        report["regressions"] = compare(results, baseline, args.tolerance)
+
+    out = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(out + "\n")
+    print(out)
+    sys.exit(1 if report.get("regressions") else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Compare ORM + response_model list serialization with the FAST_JSON column path.
+
+    python bench/serialization.py --rows 5000 --repeat 20
+
+Runs in-process against a throwaway SQLite file and prints JSON timings.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return round(min(times) * 1000, 2)
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--rows", type=int, default=5000)
+    p.add_argument("--repeat", type=int, default=20)
+    args = p.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp}/bench.db")
+    from fastapi.encoders import jsonable_encoder
+    from app import crud, models, schemas, serialize
+    from app.db import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.add_all(
+            models.Service(name=f"Service {i}", slug=f"service-{i}", description="Lorem ipsum dolor sit amet " * 4, price=i)
+            for i in range(args.rows)
+        )
+        db.add_all(
+            models.Ticket(name="Bench", email=f"user{i}@example.com", subject=f"Subject {i}",
+                          message="Please help with my account " * 3, status="open")
+            for i in range(args.rows)
+        )
+        db.commit()
+
+    def orm_services():
+        # What FastAPI does for response_model=list[ServiceOut] on ORM rows.
+        with SessionLocal() as db:
+            rows = crud.get_services(db)
+            out = [schemas.ServiceOut.model_validate(r) for r in rows]
+            return json.dumps(jsonable_encoder(out)).encode()
+
+    def fast_services():
+        with SessionLocal() as db:
+            return serialize.SERVICES.fetch(db)
+
+    def orm_tickets():
+        with SessionLocal() as db:
+            rows, _ = crud.get_tickets(db, limit=args.rows)
+            out = [schemas.TicketOut.model_validate(r) for r in rows]
+            return json.dumps(jsonable_encoder(out)).encode()
+
+    def fast_tickets():
+        with SessionLocal() as db:
+            rows, _ = crud.get_tickets(db, limit=args.rows, columns=serialize.TICKET_COLUMNS)
+            return serialize.TICKETS.dump(rows)
+
+    assert json.loads(orm_services()) == json.loads(fast_services())
+    results = {
+        "rows": args.rows,
+        "services_ms": {"orm": best_of(orm_services, args.repeat), "fast": best_of(fast_services, args.repeat)},
+        "tickets_ms": {"orm": best_of(orm_tickets, args.repeat), "fast": best_of(fast_tickets, args.repeat)},
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
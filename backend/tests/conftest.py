@@ -0,0 +1,29 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Config is read at import time, so the throwaway database has to be set first.
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ["UPLOAD_DIR"] = tempfile.mkdtemp()
+os.environ.setdefault("RATE_LIMIT_TICKETS_BURST", "1000")
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app import migrations
+    from app.main import app
+
+    with TestClient(app) as c:
+        assert migrations.schema_ready.wait(10)
+        yield c
+
+
+@pytest.fixture(scope="session")
+def admin_headers():
+    from app.auth import create_token
+
+    return {"Authorization": "Bearer " + create_token()}
@@ -0,0 +1,19 @@
+import asyncio
+
+from app.cache import ContentCache
+
+
+def test_cold_async_fill_runs_the_loader_once():
+    cache, calls = ContentCache(), []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"n": len(calls)}
+
+    async def main():
+        return await asyncio.gather(*(cache.aget("services", loader) for _ in range(10)))
+
+    entries = asyncio.run(main())
+    assert len(calls) == 1
+    assert {e.body for e in entries} == {b'{"n":1}'}
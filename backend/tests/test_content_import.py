@@ -0,0 +1,36 @@
+from sqlalchemy import delete, select
+
+from app import content, models
+from app.db import SessionLocal
+
+SERVICES = {"services": [
+    {"name": "Import one", "slug": "import-one", "description": "Imported service one", "price": 1},
+    {"name": "Import two", "slug": "import-two", "description": "Imported service two", "price": 2},
+]}
+
+
+def test_import_upserts_and_rejects_oversized_bodies(client, admin_headers, monkeypatch):
+    r = client.post("/api/content/import", json=SERVICES, headers=admin_headers)
+    assert r.status_code == 200, r.text
+    assert r.json()["services"] == {"inserted": 2, "updated": 0}
+
+    monkeypatch.setattr("app.main.UPLOAD_MAX_BYTES", 100)
+    r = client.post("/api/content/import", json=SERVICES, headers=admin_headers)
+    assert r.status_code == 413
+    # Without a Content-Length the body is cut off while it streams.
+    chunks = iter([b'{"services": [', b" " * 200, b"]}"])
+    r = client.post("/api/content/import", content=chunks, headers={**admin_headers, "Content-Type": "application/json"})
+    assert r.status_code == 413
+
+
+def test_generic_upsert_updates_and_reinserts(client):
+    with SessionLocal() as db:
+        ids = dict(db.execute(select(models.Service.slug, models.Service.id)
+                              .where(models.Service.slug.in_(["import-one", "import-two"]))).all())
+        db.execute(delete(models.Service).where(models.Service.id == ids["import-two"]))
+        rows = [{"id": ids[s["slug"]], **s, "description": "Upserted " + s["slug"]} for s in SERVICES["services"]]
+        content._update_then_insert(db, models.Service, rows)
+        db.commit()
+        got = dict(db.execute(select(models.Service.id, models.Service.description)
+                              .where(models.Service.id.in_(ids.values()))).all())
+    assert got == {ids["import-one"]: "Upserted import-one", ids["import-two"]: "Upserted import-two"}
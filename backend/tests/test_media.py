@@ -0,0 +1,68 @@
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from app import media
+from app.config import UPLOAD_DIR, UPLOAD_URL_PREFIX
+
+BODY = bytes(range(256)) * 4  # 1024 bytes
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=1000-", (1000, 1023)),
+    ("bytes=1000-5000", (1000, 1023)),
+    ("bytes=-24", (1000, 1023)),
+    ("bytes=-5000", (0, 1023)),
+    ("bytes=0-0,5-9", None),  # multi-range: whole file
+    ("bytes=9-5", None),
+    ("bytes=-0", None),
+    ("bytes=x-y", None),
+    ("items=0-9", None),
+])
+def test_parse_range(header, expected):
+    assert media.parse_range(header, len(BODY)) == expected
+
+
+def test_parse_range_unsatisfiable():
+    with pytest.raises(HTTPException) as e:
+        media.parse_range("bytes=1024-", len(BODY))
+    assert e.value.status_code == 416
+    assert e.value.headers["Content-Range"] == "bytes */1024"
+
+
+@pytest.fixture
+def upload():
+    path = os.path.join(UPLOAD_DIR, "media", "range.bin")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(BODY)
+    yield f"{UPLOAD_URL_PREFIX}/media/range.bin"
+    os.remove(path)
+
+
+def test_range_if_range_and_not_modified(client, upload):
+    full = client.get(upload)
+    assert full.status_code == 200 and full.content == BODY
+    etag, modified = full.headers["etag"], full.headers["last-modified"]
+
+    r = client.get(upload, headers={"Range": "bytes=10-19"})
+    assert r.status_code == 206 and r.content == BODY[10:20]
+    assert r.headers["content-range"] == "bytes 10-19/1024"
+    assert r.headers["content-length"] == "10"
+    assert client.get(upload, headers={"Range": "bytes=1024-"}).status_code == 416
+
+    # If-Range: a current validator gets the slice, a stale one the whole file.
+    for validator in (etag, modified):
+        r = client.get(upload, headers={"Range": "bytes=-4", "If-Range": validator})
+        assert r.status_code == 206 and r.content == BODY[-4:]
+    r = client.get(upload, headers={"Range": "bytes=-4", "If-Range": '"stale"'})
+    assert r.status_code == 200 and r.content == BODY
+
+    r = client.get(upload, headers={"If-None-Match": etag})
+    assert r.status_code == 304 and r.content == b"" and r.headers["etag"] == etag
+    assert client.get(upload, headers={"If-Modified-Since": modified}).status_code == 304
+    assert client.get(upload, headers={"If-None-Match": '"other"'}).status_code == 200
+    assert client.head(upload, headers={"Range": "bytes=0-9"}).status_code == 206
@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+# The replica engines are built from the environment at import time, so this
+# runs the app in a fresh interpreter with a second SQLite file as its replica.
+SCRIPT = textwrap.dedent("""
+    from fastapi.testclient import TestClient
+
+    from app import migrations
+    from app.auth import create_token
+    from app.db import STICKY_COOKIE
+    from app.main import app
+
+    headers = {"Authorization": "Bearer " + create_token()}
+    ticket = {"name": "Ann", "email": "ann@example.com", "subject": "Replica", "message": "lagging"}
+
+    with TestClient(app) as c:
+        assert migrations.schema_ready.wait(10)
+
+        # The replica has its own copy of the schema.
+        r = c.get("/api/tickets", headers=headers)
+        assert r.status_code == 200 and r.json() == [], r.text
+        r = c.get("/api/tickets/stats", headers=headers)
+        assert r.status_code == 200 and r.json()["total"] == 0, r.text
+
+        r = c.post("/api/tickets", json=ticket)
+        assert r.status_code == 201, r.text
+        assert STICKY_COOKIE in r.cookies
+        created = r.json()["id"]
+
+        # The writer reads its own write from the primary while the cookie lasts.
+        assert [t["id"] for t in c.get("/api/tickets", headers=headers).json()] == [created]
+        assert c.get("/api/tickets/stats", headers=headers).json()["total"] == 1
+
+        # Without it, reads go to the replica, which has not seen the ticket.
+        c.cookies.clear()
+        assert c.get("/api/tickets", headers=headers).json() == []
+        assert c.get("/api/tickets/stats", headers=headers).json()["total"] == 0
+""")
+
+
+@pytest.mark.parametrize("db_async", ["0", "1"])
+def test_replica_reads_and_read_your_writes(tmp_path, db_async):
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmp_path}/primary.db",
+        DATABASE_REPLICA_URLS=f"sqlite:///{tmp_path}/replica.db",
+        READ_YOUR_WRITES_S="60",
+        DB_ASYNC=db_async,
+    )
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", SCRIPT], cwd=backend, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
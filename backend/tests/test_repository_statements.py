@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+from sqlalchemy import delete, event
+
+from app import crud, models, repository, schemas
+from app.db import SessionLocal, engine
+
+SERVICE = schemas.ServiceCreate(name="Statement service", slug="statement-service", description="Statement count test", price=10)
+OTHER = schemas.ServiceCreate(name="Other statement service", slug="statement-service", description="Statement count test", price=10)
+LEADER = schemas.LeaderCreate(name="Statement Leader", photo=None, bio="Bio")
+RESOURCE = schemas.ResourceCreate(title="Statement resource", description=None, type="article", url="https://example.com")
+PARTNER = schemas.PartnerCreate(name="Statement Partner", logo=None, link="https://example.com")
+TICKET = schemas.TicketCreate(name="Bench", email="bench@example.com", subject="Subject", message="Please help")
+
+
+@pytest.fixture
+def statements():
+    # Only this thread's: the app's background threads share the engine.
+    seen, me = [], threading.get_ident()
+
+    def record(conn, cursor, statement, *args):
+        if threading.get_ident() == me:
+            seen.append(" ".join(statement.split()))
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def conflict(db):
+    with pytest.raises(repository.ConflictError):
+        crud.create_service(db, OTHER)
+
+
+# One statement per write on dialects with RETURNING, plus a read-back by id on
+# MySQL (COMMIT is not counted). Ticket writes include their ticket_stats upserts.
+def test_admin_writes_stay_within_statement_budget(client, statements):
+    with SessionLocal() as db:
+        db.execute(delete(models.About))
+        db.commit()
+    dialect = engine.dialect
+    read_back = 0 if dialect.update_returning else 1
+    ids = {}
+    ops = [
+        ("service.create", lambda db: ids.__setitem__("service", crud.create_service(db, SERVICE).id), 1 + read_back),
+        ("service.create_conflict", conflict, 1),
+        ("service.update", lambda db: crud.update_service(db, ids["service"], schemas.ServiceUpdate(**SERVICE.model_dump())), 1 + read_back),
+        ("service.patch", lambda db: crud.update_service(db, ids["service"], schemas.ServiceUpdate(price=12.5)), 1 + read_back),
+        ("service.delete", lambda db: crud.delete_service(db, ids["service"]), 1),
+        ("about.first_write", lambda db: crud.update_about(db, schemas.AboutCreate(content="About us")), 2 + 2 * read_back),
+        ("about.update", lambda db: crud.update_about(db, schemas.AboutCreate(content="About us!")), 1 + read_back),
+        ("leader.create", lambda db: ids.__setitem__("leader", crud.create_leader(db, LEADER).id), 1 + read_back),
+        ("leader.patch", lambda db: crud.update_leader(db, ids["leader"], schemas.LeaderUpdate(bio="New bio")), 1 + read_back),
+        ("leader.delete", lambda db: crud.delete_leader(db, ids["leader"]), 1),
+        ("resource.create", lambda db: ids.__setitem__("resource", crud.create_resource(db, RESOURCE).id), 1 + read_back),
+        ("resource.patch", lambda db: crud.update_resource(db, ids["resource"], schemas.ResourceUpdate(type="policy")), 1 + read_back),
+        ("resource.delete", lambda db: crud.delete_resource(db, ids["resource"]), 1),
+        ("partner.create", lambda db: ids.__setitem__("partner", crud.create_partner(db, PARTNER).id), 1 + read_back),
+        ("partner.patch", lambda db: crud.update_partner(db, ids["partner"], schemas.PartnerUpdate(link="https://example.org")), 1 + read_back),
+        ("partner.delete", lambda db: crud.delete_partner(db, ids["partner"]), 1),
+        ("ticket.create", lambda db: ids.__setitem__("ticket", crud.create_ticket(db, TICKET).id), 2 + read_back),
+        ("ticket.update", lambda db: crud.update_ticket(db, ids["ticket"], "closed"), 3 + read_back),
+        ("ticket.delete", lambda db: crud.delete_ticket(db, ids["ticket"]), 2 + (0 if dialect.delete_returning else 1)),
+    ]
+    over = {}
+    for name, fn, budget in ops:
+        with SessionLocal() as db:
+            statements.clear()
+            fn(db)
+            if len(statements) > budget:
+                over[name] = list(statements)
+    assert over == {}
+
+
+def test_conflicts_are_a_400(client, admin_headers):
+    body = {"name": "Conflict service", "slug": "conflict-service", "description": "Unique constraint test"}
+    assert client.post("/api/services", json=body, headers=admin_headers).status_code == 201
+    r = client.post("/api/services", json={**body, "name": "Conflict service 2"}, headers=admin_headers)
+    assert r.status_code == 400
+    assert r.json()["detail"]
@@ -0,0 +1,36 @@
+def search(client, q, scope="services", **params):
+    r = client.get("/api/search", params={"q": q, "scope": scope, **params})
+    assert r.status_code == 200, r.text
+    return [hit["id"] for hit in r.json()["items"]]
+
+
+def test_search_follows_writes(client, admin_headers):
+    r = client.post("/api/services", json={
+        "name": "Quokka backups", "slug": "quokka-backups", "description": "Nightly offsite quokka snapshots",
+    }, headers=admin_headers)
+    assert r.status_code == 201, r.text
+    sid = r.json()["id"]
+    assert search(client, "quokka") == [sid]
+
+    r = client.patch(f"/api/services/{sid}", json={"description": "Nightly offsite wombat snapshots"}, headers=admin_headers)
+    assert r.status_code == 200, r.text
+    assert search(client, "wombat") == [sid]
+    # The name still mentions it; the description no longer does.
+    assert search(client, "quokka") == [sid]
+    assert search(client, "nightly OR") == [sid]
+
+    assert client.delete(f"/api/services/{sid}", headers=admin_headers).status_code == 204
+    assert search(client, "wombat") == []
+
+
+def test_search_ranks_and_pages(client, admin_headers):
+    ids = []
+    for i, text in enumerate(["numbat numbat numbat habitat", "numbat habitat survey", "habitat"]):
+        r = client.post("/api/services", json={
+            "name": f"Numbat service {i}", "slug": f"numbat-{i}", "description": f"{text} report",
+        }, headers=admin_headers)
+        ids.append(r.json()["id"])
+    assert search(client, "numbat") == ids
+    r = client.get("/api/search", params={"q": "numbat", "limit": 2})
+    assert r.json()["next_offset"] == 2
+    assert search(client, "numbat", limit=2, offset=2) == [ids[2]]
@@ -0,0 +1,78 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+
+from app import archive, models
+from app.db import SessionLocal
+
+TICKET = {"name": "Ann", "email": "ann@example.com", "subject": "Printer jammed", "message": "archivable zebra"}
+
+
+def archived_tickets(client, headers, n):
+    ids = [client.post("/api/tickets", json=TICKET).json()["id"] for _ in range(n)]
+    for i in ids:
+        assert client.patch(f"/api/tickets/{i}", params={"status": "closed"}, headers=headers).status_code == 200
+    old = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=400)
+    with SessionLocal() as db:
+        db.execute(update(models.Ticket).where(models.Ticket.id.in_(ids)).values(closed_at=old))
+        db.commit()
+    archive.run(days=180)
+    with SessionLocal() as db:
+        assert db.scalars(select(models.TicketArchive.id).where(models.TicketArchive.id.in_(ids))).all() == ids
+    return ids
+
+
+def stats_total(client, headers):
+    return client.get("/api/tickets/stats", headers=headers).json()["total"]
+
+
+def test_archived_tickets_are_listed_exported_and_searched(client, admin_headers):
+    ids = archived_tickets(client, admin_headers, 3)
+    live = client.post("/api/tickets", json=TICKET).json()["id"]
+
+    listed = [t["id"] for t in client.get("/api/tickets", params={"limit": 500}, headers=admin_headers).json()]
+    assert live in listed and not set(ids) & set(listed)
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 2, "include_archived": True, **({"cursor": cursor} if cursor else {})}
+        r = client.get("/api/tickets", params=params, headers=admin_headers)
+        pages += [t["id"] for t in r.json()]
+        cursor = r.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert len(pages) == len(set(pages)) and set(ids) | {live} <= set(pages)
+    closed = client.get("/api/tickets", params={"limit": 500, "status": "closed", "include_archived": True}, headers=admin_headers)
+    assert set(ids) <= {t["id"] for t in closed.json()}
+
+    exported = [json.loads(line)["id"] for line in client.get("/api/tickets/export", headers=admin_headers).text.splitlines()]
+    assert set(ids) | {live} <= set(exported)
+    hot_only = client.get("/api/tickets/export", params={"include_archived": False}, headers=admin_headers).text
+    assert not set(ids) & {json.loads(line)["id"] for line in hot_only.splitlines()}
+
+    hits = client.get("/api/search", params={"q": "zebra", "scope": "tickets", "limit": 50}, headers=admin_headers).json()
+    assert set(ids) | {live} <= {h["id"] for h in hits["items"]}
+
+
+def test_archived_ticket_patch_and_delete(client, admin_headers):
+    resolved, reopened, deleted = archived_tickets(client, admin_headers, 3)
+    total = stats_total(client, admin_headers)
+
+    r = client.patch(f"/api/tickets/{resolved}", params={"status": "resolved"}, headers=admin_headers)
+    assert r.status_code == 200 and r.json()["status"] == "resolved"
+    with SessionLocal() as db:
+        assert db.get(models.TicketArchive, resolved).status == "resolved"
+
+    r = client.patch(f"/api/tickets/{reopened}", params={"status": "open"}, headers=admin_headers)
+    assert r.status_code == 200 and r.json()["status"] == "open"
+    with SessionLocal() as db:
+        assert db.get(models.TicketArchive, reopened) is None
+        t = db.get(models.Ticket, reopened)
+        assert t.status == "open" and t.closed_at is None
+
+    assert client.delete(f"/api/tickets/{deleted}", headers=admin_headers).status_code == 204
+    assert client.get(f"/api/tickets/{deleted}", headers=admin_headers).status_code == 404
+    assert client.delete(f"/api/tickets/{deleted}", headers=admin_headers).status_code == 404
+    assert client.patch(f"/api/tickets/{deleted}", params={"status": "open"}, headers=admin_headers).status_code == 404
+    assert stats_total(client, admin_headers) == total - 1
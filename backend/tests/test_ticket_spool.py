@@ -0,0 +1,50 @@
+from sqlalchemy import func, select
+
+from app import models, schemas, spool, stats
+from app.db import SessionLocal
+
+TICKET = schemas.TicketCreate(name="Ann", email="ann@example.com", subject="Spooled", message="write-behind")
+
+
+def count(receipts):
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).where(models.Ticket.receipt.in_(receipts)))
+
+
+def test_flush_inserts_without_holding_the_spool(client, tmp_path, monkeypatch):
+    s = spool.TicketSpool(str(tmp_path / "spool.db"))
+    receipts = [s.submit(TICKET) for _ in range(3)]
+    late = []
+    tickets_inserted = stats.tickets_inserted
+
+    def during_insert(db, tickets):
+        # The main-DB transaction is open; submissions must not wait for it.
+        assert not s._lock.locked()
+        late.append(s.submit(TICKET))
+        tickets_inserted(db, tickets)
+
+    monkeypatch.setattr(stats, "tickets_inserted", during_insert)
+    assert s.flush() == 3
+    assert count(receipts) == 3
+    assert s.pending() == 1
+    monkeypatch.setattr(stats, "tickets_inserted", tickets_inserted)
+    assert s.flush() == 1 and count(late) == 1 and s.pending() == 0
+
+
+def test_replayed_batch_is_not_inserted_twice(client, tmp_path, monkeypatch):
+    s = spool.TicketSpool(str(tmp_path / "spool.db"))
+    receipts = [s.submit(TICKET) for _ in range(2)]
+
+    # Die after the main-DB commit, before the spooled rows are deleted.
+    settle = s._settle
+    monkeypatch.setattr(s, "_settle", lambda claim, done: None if done else settle(claim, done))
+    assert s.flush() == 2
+    assert count(receipts) == 2 and s.pending() == 2
+    monkeypatch.setattr(s, "_settle", settle)
+
+    # The claim is still live, so nobody else flushes the batch...
+    assert s.flush() == 0
+    # ...until it times out, and then the receipts dedupe the replay.
+    s._conn.execute("UPDATE spool SET claimed_until = 0")
+    assert s.flush() == 2
+    assert count(receipts) == 2 and s.pending() == 0
@@ -0,0 +1,19 @@
+from datetime import date
+
+from sqlalchemy import select
+
+from app import models, stats
+from app.db import SessionLocal
+
+DAY = date(2001, 2, 3)
+
+
+def test_generic_upsert_inserts_then_adds(client):
+    # The fallback apply() uses on dialects without an upsert statement.
+    with SessionLocal() as db:
+        stats._update_then_insert(db, [{"day": DAY, "status": "open", "count": 2}, {"day": DAY, "status": "closed", "count": 1}])
+        stats._update_then_insert(db, [{"day": DAY, "status": "open", "count": -1}, {"day": DAY, "status": "closed", "count": 3}])
+        db.commit()
+        got = dict(db.execute(select(models.TicketStat.status, models.TicketStat.count)
+                              .where(models.TicketStat.day == DAY)).all())
+    assert got == {"open": 1, "closed": 4}
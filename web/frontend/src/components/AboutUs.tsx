@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react'
 import { CheckCircleIcon, UserGroupIcon, TrophyIcon, ShieldCheckIcon } from '@heroicons/react/24/outline'
-import { fetchAbout, About } from '../lib/api'
+import { fetchSite, About } from '../lib/api'
 import { BRAND } from '../branding'
 import { useInView } from '../lib/animations'
 
@@ -9,7 +9,7 @@ export default function AboutUs() {
   const [ref, isInView] = useInView<HTMLDivElement>()
 
   useEffect(() => {
-    fetchAbout().then(setAbout).catch(() => setAbout(null))
+    fetchSite().then(site => setAbout(site.about)).catch(() => setAbout(null))
   }, [])
 
   const stats = [
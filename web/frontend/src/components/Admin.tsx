@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react'
 import {
-  login, fetchServices, createService, updateService, deleteService, listTickets, Service,
+  login, logout as apiLogout, fetchServices, createService, updateService, deleteService, listTickets, fetchTicketStats, Service, TicketStats,
   fetchAbout, updateAbout, About,
   fetchLeaders, createLeader, updateLeader, deleteLeader, Leader,
   fetchResources, createResource, updateResource, deleteResource, Resource,
@@ -644,21 +644,35 @@ function PartnersCMS() {
 // --- TicketsPanel ---
 function TicketsPanel() {
   const [tickets, setTickets] = useState<any[]>([])
+  const [next, setNext] = useState<string | null>(null)
+  const [stats, setStats] = useState<TicketStats | null>(null)
   const [loading, setLoading] = useState(true)
   const [err, setErr] = useState('')
 
+  async function loadPage(cursor?: string) {
+    try {
+      const page = await listTickets(cursor)
+      setTickets(prev => cursor ? [...prev, ...page.items] : page.items)
+      setNext(page.next)
+    } catch (e: any) { setErr(e.message) }
+    finally { setLoading(false) }
+  }
+
   useEffect(() => {
-    (async () => {
-      try {
-        setTickets(await listTickets())
-      } catch (e: any) { setErr(e.message) }
-      finally { setLoading(false) }
-    })()
+    loadPage()
+    fetchTicketStats().then(setStats).catch(() => {})
   }, [])
 
   return (
     <div className="card">
       <h3 className="text-lg font-semibold">Tickets</h3>
+      {stats && (
+        <p className="text-sm text-gray-600 mt-1">
+          {stats.total} total
+          {Object.entries(stats.by_status).map(([s, n]) => ` • ${n} ${s}`).join('')}
+          {stats.by_day[0] && ` • ${stats.by_day[0].total} on ${stats.by_day[0].period}`}
+        </p>
+      )}
       {loading ? <p className="mt-4">Loading...</p> : (
         <div className="mt-4 space-y-3">
           {tickets.map(t => (
@@ -670,6 +684,7 @@ function TicketsPanel() {
             </div>
           ))}
           {tickets.length === 0 && <p className="text-gray-600">No tickets yet.</p>}
+          {next && <button onClick={() => loadPage(next)} className="btn btn-outline">Load more</button>}
         </div>
       )}
       {err && <p className="text-red-600 mt-2">{err}</p>}
@@ -680,7 +695,7 @@ function TicketsPanel() {
 // --- Main Admin Export ---
 export default function Admin() {
   const [authed, setAuthed] = useState<boolean>(!!localStorage.getItem('token'))
-  function logout() { localStorage.removeItem('token'); setAuthed(false) }
+  async function logout() { await apiLogout().catch(() => {}); setAuthed(false) }
   if (!authed) return <div className="py-12 container"><LoginForm onSuccess={() => setAuthed(true)} /></div>
   return (
     <section className="py-12 container space-y-8">
@@ -1,14 +1,15 @@
 import React, { useEffect, useState } from 'react'
 import { EnvelopeIcon, UserIcon } from '@heroicons/react/24/outline'
-import { fetchLeaders, Leader } from '../lib/api'
+import { fetchSite, Leader } from '../lib/api'
 import { useInView } from '../lib/animations'
+import ResponsiveImage from './ResponsiveImage'
 
 export default function Leadership() {
   const [leaders, setLeaders] = useState<Leader[]>([])
   const [ref, isInView] = useInView<HTMLDivElement>()
 
   useEffect(() => {
-    fetchLeaders().then(setLeaders).catch(() => setLeaders([]))
+    fetchSite().then(site => setLeaders(site.leaders)).catch(() => setLeaders([]))
   }, [])
 
   // Default team members if no leaders are loaded
@@ -59,7 +60,9 @@ export default function Leadership() {
                 {/* Profile Image */}
                 <div className="relative mb-6">
                   {leader.photo ? (
-                    <img
+                    <ResponsiveImage
+                      variants={'photo_variants' in leader ? leader.photo_variants : undefined}
+                      sizes="128px"
                       src={
                         leader.photo.startsWith('/assets/')
                           ? leader.photo
@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react'
-import { fetchPartners, Partner } from '../lib/api'
+import { fetchSite, Partner } from '../lib/api'
 import { useInView } from '../lib/animations'
+import ResponsiveImage from './ResponsiveImage'
 import 'keen-slider/keen-slider.min.css'
 import { useKeenSlider } from 'keen-slider/react'
 
@@ -9,8 +10,8 @@ export default function PartnersSlider() {
   const [ref, isInView] = useInView<HTMLDivElement>()
 
   useEffect(() => {
-    fetchPartners()
-      .then(setPartners)
+    fetchSite()
+      .then(site => setPartners(site.partners))
       .catch(() => {
         // Default partners if API fails
         const defaultPartners = [
@@ -99,7 +100,9 @@ export default function PartnersSlider() {
                       rel="noopener noreferrer"
                       className="block w-full h-full flex items-center justify-center group-hover:scale-110 transition-transform duration-300"
                     >
-                      <img
+                      <ResponsiveImage
+                        variants={partner.logo_variants}
+                        sizes="240px"
                         src={
                           partner.logo?.startsWith('/assets/')
                             ? partner.logo
@@ -122,7 +125,9 @@ export default function PartnersSlider() {
                     </a>
                   ) : (
                     <div className="w-full h-full flex items-center justify-center group-hover:scale-110 transition-transform duration-300">
-                      <img
+                      <ResponsiveImage
+                        variants={partner.logo_variants}
+                        sizes="240px"
                         src={
                           partner.logo?.startsWith('/assets/')
                             ? partner.logo
@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react'
 import { DocumentTextIcon, BookOpenIcon, NewspaperIcon, AcademicCapIcon, ArrowTopRightOnSquareIcon, FunnelIcon } from '@heroicons/react/24/outline'
-import { fetchResources, Resource } from '../lib/api'
+import { fetchSite, Resource } from '../lib/api'
 import { useInView } from '../lib/animations'
 
 export default function Resources() {
@@ -10,8 +10,8 @@ export default function Resources() {
   const [ref, isInView] = useInView<HTMLDivElement>()
 
   useEffect(() => {
-    fetchResources()
-      .then(data => {
+    fetchSite()
+      .then(({ resources: data }) => {
         setResources(data)
         setFilteredResources(data)
       })
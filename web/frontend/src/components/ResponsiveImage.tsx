@@ -0,0 +1,38 @@
+import React, { useState } from 'react'
+import { ImageVariant } from '../lib/api'
+
+type Props = React.ImgHTMLAttributes<HTMLImageElement> & {
+  variants?: ImageVariant[]
+  // Rendered width of the image, e.g. '128px'; picks the variant to download.
+  sizes: string
+}
+
+// Offers the resized AVIF/WebP variants the backend generates for an upload,
+// one <source> per format; the original file is the fallback. If a variant
+// fails to load, the variants are dropped and the original is used.
+export default function ResponsiveImage({ variants, sizes, onError, ...img }: Props) {
+  const [failed, setFailed] = useState(false)
+
+  const byType = new Map<string, ImageVariant[]>()
+  for (const v of failed ? [] : variants ?? []) {
+    byType.set(v.type, [...(byType.get(v.type) ?? []), v])
+  }
+
+  if (byType.size === 0) {
+    return <img {...img} onError={onError} />
+  }
+
+  return (
+    <picture className="contents">
+      {Array.from(byType, ([type, list]) => (
+        <source
+          key={type}
+          type={type}
+          sizes={sizes}
+          srcSet={list.map(v => `${v.url} ${v.width}w`).join(', ')}
+        />
+      ))}
+      <img {...img} onError={() => setFailed(true)} />
+    </picture>
+  )
+}
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react'
 import { ArrowRightIcon, FunnelIcon } from '@heroicons/react/24/outline'
-import { Service } from '../lib/api'
+import { fetchSite, Service } from '../lib/api'
 
 export default function Services() {
   const [services, setServices] = useState<Service[]>([])
@@ -68,16 +68,10 @@ export default function Services() {
   ]
 
   useEffect(() => {
-    const fetchServices = async () => {
+    const loadServices = async () => {
       try {
-        const response = await fetch('/api/services')
-        if (response.ok) {
-          const data = await response.json()
-          setServices(data)
-        } else {
-          // Use default services if API is not available
-          setServices(defaultServices)
-        }
+        const site = await fetchSite()
+        setServices(site.services)
       } catch (error) {
         console.log('Using default services data')
         setServices(defaultServices)
@@ -86,7 +80,7 @@ export default function Services() {
       }
     }
 
-    fetchServices()
+    loadServices()
   }, [])
 
   const filteredServices = selectedCategory === 'all' 
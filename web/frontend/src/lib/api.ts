@@ -24,11 +24,18 @@ export type About = {
   content: string
 }
 
+export type ImageVariant = {
+  url: string
+  width: number
+  type: string
+}
+
 export type Leader = {
   id: number
   name: string
   photo?: string
   bio?: string
+  photo_variants?: ImageVariant[]
 }
 
 export type Resource = {
@@ -44,6 +51,15 @@ export type Partner = {
   name: string
   logo?: string
   link?: string
+  logo_variants?: ImageVariant[]
+}
+
+export type Site = {
+  services: Service[]
+  about: About | null
+  leaders: Leader[]
+  resources: Resource[]
+  partners: Partner[]
 }
 
 const apiBase = '/api'
@@ -53,6 +69,23 @@ function authHeaders(): Record<string, string> {
   return token ? { 'Authorization': `Bearer ${token}` } : {}
 }
 
+// --- Public site ---
+// Everything the public page shows, in one request (/api/site). The sections
+// that mount together share the same response; a failed load is retried by
+// the next caller. The admin screens use the per-kind fetchers below.
+let sitePromise: Promise<Site> | null = null
+
+export function fetchSite(): Promise<Site> {
+  if (!sitePromise) {
+    sitePromise = fetch(`${apiBase}/site`).then(r => {
+      if (!r.ok) throw new Error('Failed to fetch site content')
+      return r.json()
+    })
+    sitePromise.catch(() => { sitePromise = null })
+  }
+  return sitePromise
+}
+
 // --- Auth ---
 export async function login(username: string, password: string) {
   const r = await fetch(`${apiBase}/auth/login`, {
@@ -66,6 +99,14 @@ export async function login(username: string, password: string) {
   return data
 }
 
+export async function logout() {
+  try {
+    await fetch(`${apiBase}/auth/logout`, { method: 'POST', headers: { ...authHeaders() } })
+  } finally {
+    localStorage.removeItem('token')
+  }
+}
+
 // --- Services ---
 export async function fetchServices(): Promise<Service[]> {
   const r = await fetch(`${apiBase}/services`)
@@ -103,9 +144,24 @@ export async function deleteService(id: number) {
 }
 
 // --- Tickets ---
-export async function listTickets() {
-  const r = await fetch(`${apiBase}/tickets`, { headers: { ...authHeaders() } })
+export async function listTickets(cursor?: string): Promise<{ items: any[], next: string | null }> {
+  const qs = cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''
+  const r = await fetch(`${apiBase}/tickets${qs}`, { headers: { ...authHeaders() } })
   if (!r.ok) throw new Error('Failed to load tickets')
+  return { items: await r.json(), next: r.headers.get('X-Next-Cursor') }
+}
+
+export type TicketStatsBucket = { period: string, total: number, by_status: Record<string, number> }
+export type TicketStats = {
+  total: number
+  by_status: Record<string, number>
+  by_day: TicketStatsBucket[]
+  by_week: TicketStatsBucket[]
+}
+
+export async function fetchTicketStats(): Promise<TicketStats> {
+  const r = await fetch(`${apiBase}/tickets/stats`, { headers: { ...authHeaders() } })
+  if (!r.ok) throw new Error('Failed to load ticket stats')
   return r.json()
 }
 
@@ -249,7 +305,7 @@ export async function deletePartner(id: number) {
 export async function uploadFile(category: "leaders" | "partners" | "services" | "aboutus" | "resources", file: File): Promise<string> {
   const formData = new FormData();
   formData.append("file", file);
-  const res = await fetch(`http://localhost:8000/upload/${category}`, {
+  const res = await fetch(`/upload/${category}`, {
     method: "POST",
     body: formData,
   });